@@ -0,0 +1,480 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, time as dtime, timedelta, datetime, UTC
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import bcrypt
+import httpx
+from sqlalchemy import insert, delete
+
+from src.core.models.base import Base
+from src.core.models.sleep_adherence_reports import SleepAdherenceReportsORM  # noqa: F401
+from src.core.models.sleep_goals import SleepGoalsORM
+from src.core.models.sleep_notes import SleepNotesORM
+from src.core.models.users import UsersORM
+from src.core.session import init_engine, dispose_engine
+
+ROOT = Path(__file__).resolve().parent.parent
+PASSWORD = "benchmark-password"
+HISTORY_START = date(2000, 1, 1)
+SCRATCH_START = date(2100, 1, 1)
+
+
+@dataclass
+class BenchUser:
+    id: int
+    username: str
+    access_token: str = ""
+    refresh_token: str = ""
+    note_ids: list[int] = field(default_factory=list)
+    scratch_day: int = 0
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    def next_scratch_date(self) -> date:
+        self.scratch_day += 1
+        return SCRATCH_START + timedelta(days=self.scratch_day)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.wall_seconds: dict[str, float] = {}
+
+    async def timed(self, route: str, request: Awaitable[httpx.Response], expected: int) -> httpx.Response:
+        start = time.perf_counter()
+        response = await request
+        elapsed = time.perf_counter() - start
+        self.latencies.setdefault(route, []).append(elapsed)
+        if response.status_code != expected:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        return response
+
+    def report(self) -> dict:
+        routes = {}
+        for route, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            wall = self.wall_seconds.get(route, sum(latencies))
+            routes[route] = {
+                "requests": len(ordered),
+                "errors": self.errors.get(route, 0),
+                "throughput_rps": len(ordered) / wall if wall else 0.0,
+                "mean_ms": statistics.fmean(ordered) * 1000,
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p95_ms": percentile(ordered, 95) * 1000,
+                "p99_ms": percentile(ordered, 99) * 1000
+            }
+        return routes
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+Step = Callable[[httpx.AsyncClient, BenchUser, Recorder], Awaitable[None]]
+
+
+async def login(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    response = await recorder.timed(
+        "POST /auth/login/",
+        client.post("/auth/login/", json={"username": user.username, "password": PASSWORD}),
+        201
+    )
+    tokens = response.json()
+    user.access_token = tokens["access_token"]
+    user.refresh_token = tokens["refresh_token"]
+
+
+async def refresh(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    response = await recorder.timed(
+        "POST /auth/refresh/",
+        client.post("/auth/refresh/", headers={"Authorization": f"Bearer {user.refresh_token}"}),
+        201
+    )
+    tokens = response.json()
+    user.access_token = tokens["access_token"]
+    user.refresh_token = tokens["refresh_token"]
+
+
+async def get_user(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    await recorder.timed("GET /users/", client.get("/users/", headers=user.headers), 200)
+
+
+async def update_user(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    body = {"display_name": uuid.uuid4().hex[:20]}
+    await recorder.timed("PATCH /users/", client.patch("/users/", json=body, headers=user.headers), 200)
+
+
+async def create_and_delete_user(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    username = f"bench_tmp_{uuid.uuid4().hex[:16]}"
+    body = {"username": username, "display_name": "tmp", "password": PASSWORD}
+    await recorder.timed("POST /users/", client.post("/users/", json=body), 201)
+
+    response = await client.post("/auth/login/", json={"username": username, "password": PASSWORD})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    await recorder.timed("DELETE /users/", client.delete("/users/", headers=headers), 200)
+
+
+async def get_goal(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    await recorder.timed("GET /goals/", client.get("/goals/", headers=user.headers), 200)
+
+
+async def update_goal(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    body = {"sleep_start": "23:00:00"}
+    await recorder.timed("PATCH /goals/", client.patch("/goals/", json=body, headers=user.headers), 200)
+
+
+async def put_goal(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    body = {"sleep_start": "23:00:00", "sleep_end": "07:00:00"}
+    await recorder.timed("PUT /goals/", client.put("/goals/", json=body, headers=user.headers), 200)
+
+
+async def delete_and_create_goal(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    await recorder.timed("DELETE /goals/", client.delete("/goals/", headers=user.headers), 200)
+    body = {"sleep_start": "23:00:00", "sleep_end": "07:00:00"}
+    await recorder.timed("POST /goals/", client.post("/goals/", json=body, headers=user.headers), 201)
+
+
+def history_date(user: BenchUser) -> date:
+    return HISTORY_START + timedelta(days=user.scratch_day % len(user.note_ids))
+
+
+async def get_note_by_id(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    note_id = user.note_ids[user.scratch_day % len(user.note_ids)]
+    user.scratch_day += 1
+    await recorder.timed("GET /notes/{note_id}", client.get(f"/notes/{note_id}", headers=user.headers), 200)
+
+
+async def get_note_by_date(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    params = {"note_date": history_date(user).isoformat()}
+    user.scratch_day += 1
+    await recorder.timed("GET /notes/", client.get("/notes/", params=params, headers=user.headers), 200)
+
+
+async def get_note_range(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    params = {"from": HISTORY_START.isoformat(), "to": (HISTORY_START + timedelta(days=30)).isoformat()}
+    await recorder.timed("GET /notes/range", client.get("/notes/range", params=params, headers=user.headers), 200)
+
+
+async def get_note_stats(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    params = {
+        "period": "month",
+        "from": HISTORY_START.isoformat(),
+        "to": (HISTORY_START + timedelta(days=len(user.note_ids))).isoformat()
+    }
+    await recorder.timed("GET /notes/stats", client.get("/notes/stats", params=params, headers=user.headers), 200)
+
+
+async def search_notes(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    params = {"q": "seeded"}
+    await recorder.timed("GET /notes/search", client.get("/notes/search", params=params, headers=user.headers), 200)
+
+
+async def export_notes(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    params = {"format": "ndjson"}
+    await recorder.timed("GET /notes/export", client.get("/notes/export", params=params, headers=user.headers), 200)
+
+
+async def update_note_by_id(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    note_id = user.note_ids[user.scratch_day % len(user.note_ids)]
+    user.scratch_day += 1
+    await recorder.timed(
+        "PATCH /notes/{note_id}",
+        client.patch(f"/notes/{note_id}", json={"rating": 4}, headers=user.headers),
+        200
+    )
+
+
+async def update_note_by_date(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    params = {"note_date": history_date(user).isoformat()}
+    user.scratch_day += 1
+    await recorder.timed(
+        "PATCH /notes/",
+        client.patch("/notes/", params=params, json={"rating": 3}, headers=user.headers),
+        200
+    )
+
+
+async def put_note_by_date(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    params = {"note_date": history_date(user).isoformat()}
+    user.scratch_day += 1
+    body = {"sleep_start": "23:30:00", "sleep_end": "07:15:00", "rating": 5, "comment": "benchmark"}
+    await recorder.timed("PUT /notes/", client.put("/notes/", params=params, json=body, headers=user.headers), 200)
+
+
+def scratch_note(note_date: date) -> dict:
+    return {
+        "note_date": note_date.isoformat(),
+        "sleep_start": "23:30:00",
+        "sleep_end": "07:15:00",
+        "rating": 4,
+        "comment": "benchmark"
+    }
+
+
+async def create_and_delete_note(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    note_date = user.next_scratch_date()
+    await recorder.timed("POST /notes/", client.post("/notes/", json=scratch_note(note_date), headers=user.headers), 201)
+    params = {"note_date": note_date.isoformat()}
+    await recorder.timed("DELETE /notes/", client.delete("/notes/", params=params, headers=user.headers), 200)
+
+    note_date = user.next_scratch_date()
+    await client.post("/notes/", json=scratch_note(note_date), headers=user.headers)
+    response = await client.get("/notes/", params={"note_date": note_date.isoformat()}, headers=user.headers)
+    note_id = response.json()["id"]
+    await recorder.timed("DELETE /notes/{note_id}", client.delete(f"/notes/{note_id}", headers=user.headers), 200)
+
+
+async def create_note_batch(client: httpx.AsyncClient, user: BenchUser, recorder: Recorder) -> None:
+    notes = [scratch_note(user.next_scratch_date()) for _ in range(50)]
+    await recorder.timed(
+        "POST /notes/batch",
+        client.post("/notes/batch", json={"notes": notes}, headers=user.headers),
+        201
+    )
+
+
+scenarios: list[tuple[str, Step]] = [
+    ("login", login),
+    ("refresh", refresh),
+    ("get_user", get_user),
+    ("update_user", update_user),
+    ("create_and_delete_user", create_and_delete_user),
+    ("get_goal", get_goal),
+    ("update_goal", update_goal),
+    ("put_goal", put_goal),
+    ("delete_and_create_goal", delete_and_create_goal),
+    ("get_note_by_id", get_note_by_id),
+    ("get_note_by_date", get_note_by_date),
+    ("get_note_range", get_note_range),
+    ("get_note_stats", get_note_stats),
+    ("search_notes", search_notes),
+    ("export_notes", export_notes),
+    ("update_note_by_id", update_note_by_id),
+    ("update_note_by_date", update_note_by_date),
+    ("put_note_by_date", put_note_by_date),
+    ("create_and_delete_note", create_and_delete_note),
+    ("create_note_batch", create_note_batch),
+]
+
+
+async def seed(run_id: str, users_count: int, notes_per_user: int) -> list[BenchUser]:
+    engine = init_engine()
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+        password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt()).hex()
+        result = await connection.execute(
+            insert(UsersORM).returning(UsersORM.id, UsersORM.username),
+            [
+                {
+                    "username": f"bench_{run_id}_{index}",
+                    "display_name": "benchmark",
+                    "password_hash": password_hash,
+                    "refresh_token_id": None
+                }
+                for index in range(users_count)
+            ]
+        )
+        users = [BenchUser(id=user_id, username=username) for user_id, username in result.all()]
+
+        await connection.execute(
+            insert(SleepGoalsORM),
+            [{"user_id": user.id, "sleep_start": dtime(23, 0), "sleep_end": dtime(7, 0)} for user in users]
+        )
+        for user in users:
+            result = await connection.execute(
+                insert(SleepNotesORM).returning(SleepNotesORM.id),
+                [
+                    {
+                        "user_id": user.id,
+                        "note_date": HISTORY_START + timedelta(days=day),
+                        "sleep_start": dtime(23, day % 60),
+                        "sleep_end": dtime(7, (day * 7) % 60),
+                        "rating": day % 5 + 1,
+                        "comment": "seeded"
+                    }
+                    for day in range(notes_per_user)
+                ]
+            )
+            user.note_ids = list(result.scalars().all())
+    return users
+
+
+async def cleanup(run_id: str) -> None:
+    engine = init_engine()
+    async with engine.begin() as connection:
+        await connection.execute(
+            delete(UsersORM).where(
+                UsersORM.username.like(f"bench_{run_id}_%") | UsersORM.username.like("bench_tmp_%")
+            )
+        )
+    await dispose_engine()
+
+
+async def run_scenario(client: httpx.AsyncClient,
+                       users: list[BenchUser],
+                       recorder: Recorder,
+                       step: Step,
+                       requests: int,
+                       concurrency: int
+                       ) -> float:
+    remaining = requests
+
+    async def worker(user: BenchUser) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await step(client, user, recorder)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(user) for user in users[:concurrency]))
+    return time.perf_counter() - start
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get("/health/ready")
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"Server at {base_url} did not become ready in {timeout}s")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args: argparse.Namespace) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    users = await seed(run_id, args.concurrency, args.notes_per_user)
+    await dispose_engine()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.main:app",
+             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT,
+            env={**os.environ, "PYTHONPATH": str(ROOT), "app.rate_limit.backend": "none"}
+        )
+
+    recorder = Recorder()
+    try:
+        await wait_until_ready(base_url, args.startup_timeout)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.request_timeout) as client:
+            await asyncio.gather(*(login(client, user, Recorder()) for user in users))
+            for name, step in scenarios:
+                if args.only and name not in args.only:
+                    continue
+                requests = args.requests if name not in ("login", "create_and_delete_user") else args.slow_requests
+                before = {route: len(values) for route, values in recorder.latencies.items()}
+                wall = await run_scenario(client, users, recorder, step, requests, args.concurrency)
+                for route, values in recorder.latencies.items():
+                    if len(values) != before.get(route, 0):
+                        recorder.wall_seconds[route] = recorder.wall_seconds.get(route, 0.0) + wall
+                print(f"{name}: {requests} iterations in {wall:.2f}s", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        await cleanup(run_id)
+
+    return {
+        "metadata": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(UTC).isoformat(),
+            "base_url": base_url,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "notes_per_user": args.notes_per_user
+        },
+        "routes": recorder.report()
+    }
+
+
+def print_report(result: dict, baseline: dict | None) -> None:
+    header = f"{'route':<28}{'req':>7}{'err':>5}{'rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    if baseline is not None:
+        header += f"{'Δp50':>9}{'Δp99':>9}{'Δrps':>9}"
+    print(header)
+    for route, stats in sorted(result["routes"].items()):
+        line = (
+            f"{route:<28}{stats['requests']:>7}{stats['errors']:>5}{stats['throughput_rps']:>10.1f}"
+            f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+        )
+        old = (baseline or {}).get("routes", {}).get(route)
+        if old is not None:
+            line += (
+                f"{relative_change(old['p50_ms'], stats['p50_ms']):>9}"
+                f"{relative_change(old['p99_ms'], stats['p99_ms']):>9}"
+                f"{relative_change(old['throughput_rps'], stats['throughput_rps']):>9}"
+            )
+        print(line)
+
+
+def relative_change(old: float, new: float) -> str:
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end HTTP benchmark for every API route")
+    parser.add_argument("--url", help="Benchmark an already running server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Iterations per scenario")
+    parser.add_argument("--slow-requests", type=int, default=200, help="Iterations for bcrypt-bound scenarios")
+    parser.add_argument("--notes-per-user", type=int, default=365)
+    parser.add_argument("--only", nargs="*", help="Run only these scenarios")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--compare", type=Path, help="Previous results file to compare against")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    result = asyncio.run(run(args))
+    args.output.write_text(json.dumps(result, indent=2))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(result, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,16 @@ from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from src.api.actions.users import get_user_by_username, get_user_by_id, update_user_refresh_token_by_id
-from src.api.schemas.auth import LoginData, CreatedTokens
-from src.api.schemas.users import UserSchema
+from src.api.actions.users import get_user_by_username
+from src.api.dals.users import UsersDAL
+from src.api.schemas.auth import LoginData, Tokens
 from src.api.utils.passwords import validate_password
 from src.api.utils.tokens import create_access_token, create_refresh_token, decode_refresh_token
 from src.api.views import user_not_found
+from src.core.session import unit_of_work
 
 
-async def authenticate_user_by_password(body: LoginData,
-                                        session: AsyncSession
-                                        ) -> UserSchema:
+async def login_user(body: LoginData, session: AsyncSession) -> Tokens:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid username or password"
@@ -24,39 +23,45 @@ async def authenticate_user_by_password(body: LoginData,
     if user is None:
         raise user_not_found
 
-    if not validate_password(body.password, user.password_hash):
+    if not await validate_password(body.password, user.password_hash):
         raise credentials_exception
 
-    return user
+    refresh_token_id = uuid.uuid4().hex
+    async with unit_of_work(session):
+        user_dal = UsersDAL(session)
+        updated_user = await user_dal.update_user_refresh_token_by_id(user.id, refresh_token_id)
+    if updated_user is None:
+        raise user_not_found
 
+    return create_tokens(updated_user.id, updated_user.username, refresh_token_id)
 
-async def authenticate_user_by_refresh_token(token: str,
-                                             session: AsyncSession
-                                             ) -> UserSchema:
 
+async def refresh_user_tokens(token: str, session: AsyncSession) -> Tokens:
     payload = decode_refresh_token(token)
 
-    user = await get_user_by_id(payload.sub, session)
-    if user is None:
+    refresh_token_id = uuid.uuid4().hex
+    async with unit_of_work(session):
+        user_dal = UsersDAL(session)
+        user = await user_dal.rotate_user_refresh_token_by_id(payload.sub, payload.jti, refresh_token_id)
+    if user is not None:
+        return create_tokens(user.id, user.username, refresh_token_id)
+
+    async with unit_of_work(session):
+        user_dal = UsersDAL(session)
+        revoked_user = await user_dal.update_user_refresh_token_by_id(payload.sub, None)
+    if revoked_user is None:
         raise user_not_found
 
-    if user.refresh_token_id != payload.jti:
-        await update_user_refresh_token_by_id(user.id, None, session)
-        raise HTTPException(status_code=401, detail="Invalid jti")
-
-    return user
+    raise HTTPException(status_code=401, detail="Invalid jti")
 
 
-def create_tokens(user: UserSchema) -> CreatedTokens:
+def create_tokens(user_id: int, username: str, refresh_token_id: str) -> Tokens:
     now = datetime.now(UTC)
-    refresh_token_id = uuid.uuid4().hex
 
-    access_token = create_access_token(user.id, user.username, now)
-    refresh_token = create_refresh_token(user.id, refresh_token_id, now)
+    access_token = create_access_token(user_id, username, now)
+    refresh_token = create_refresh_token(user_id, refresh_token_id, now)
 
-    created_tokens = CreatedTokens(
+    return Tokens(
         access_token=access_token,
-        refresh_token=refresh_token,
-        refresh_token_id=refresh_token_id
+        refresh_token=refresh_token
     )
-    return created_tokens
@@ -1,33 +1,51 @@
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.dals.sleep_goals import SleepGoalDAL
-from src.api.schemas.sleep_goals import SleepGoalCreateRequest, SleepGoalSchema
+from src.api.schemas.sleep_goals import SleepGoalCreateRequest
+from src.core.session import unit_of_work
 
 
-async def get_sleep_goal_by_user_id(user_id: int, session: AsyncSession) -> SleepGoalSchema | None:
-    async with session.begin():
+async def get_sleep_goal_by_user_id(user_id: int, session: AsyncSession) -> Row | None:
+    async with unit_of_work(session):
         sleep_goal_dal = SleepGoalDAL(session)
         sleep_goal = await sleep_goal_dal.get_sleep_goal_by_user_id(user_id)
-        if sleep_goal is None:
-            return
-        return SleepGoalSchema.model_validate(sleep_goal)
+        return sleep_goal
+
+
+async def get_sleep_goal_version_by_user_id(user_id: int, session: AsyncSession) -> int | None:
+    async with unit_of_work(session):
+        sleep_goal_dal = SleepGoalDAL(session)
+        version = await sleep_goal_dal.get_sleep_goal_version_by_user_id(user_id)
+        return version
 
 
 async def create_new_sleep_goal(user_id, body: SleepGoalCreateRequest, session: AsyncSession) -> None:
-    async with session.begin():
+    async with unit_of_work(session):
         sleep_goal_dal = SleepGoalDAL(session)
         await sleep_goal_dal.create_sleep_goal(user_id, body.sleep_start, body.sleep_end)
 
 
+async def upsert_sleep_goal(user_id: int, body: SleepGoalCreateRequest, session: AsyncSession) -> bool:
+    async with unit_of_work(session):
+        sleep_goal_dal = SleepGoalDAL(session)
+        created = await sleep_goal_dal.upsert_sleep_goal(user_id, body.sleep_start, body.sleep_end)
+        return created
+
+
 async def delete_sleep_goal_by_id(user_id: int, session: AsyncSession) -> bool:
-    async with session.begin():
+    async with unit_of_work(session):
         sleep_goal_dal = SleepGoalDAL(session)
         deleted = await sleep_goal_dal.delete_sleep_goal_by_id(user_id)
         return deleted
 
 
-async def update_sleep_goal_by_id(user_id: int, updated_params: dict, session: AsyncSession) -> bool:
-    async with session.begin():
+async def update_sleep_goal_by_id(user_id: int,
+                                  updated_params: dict,
+                                  session: AsyncSession,
+                                  expected_versions: list[int] | None = None
+                                  ) -> int | None:
+    async with unit_of_work(session):
         sleep_goal_dal = SleepGoalDAL(session)
-        updated = await sleep_goal_dal.update_sleep_goal_by_user_id(user_id, updated_params)
-        return updated
+        version = await sleep_goal_dal.update_sleep_goal_by_user_id(user_id, updated_params, expected_versions)
+        return version
@@ -1,37 +1,134 @@
 from datetime import date
+from typing import AsyncIterator, Literal
 
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.dals.sleep_notes import SleepNoteDAL
-from src.api.schemas.sleep_notes import SleepNoteSchema, SleepNoteCreateRequest
+from src.api.dals.sleep_notes import SleepNoteDAL, sleep_note_export_columns
+from src.api.schemas.sleep_notes import (
+    SleepNoteCreateRequest,
+    SleepNoteUpsertRequest,
+    SleepNoteBatchCreateRequest,
+    SleepNoteBatchCreateResponse,
+    SleepNoteBatchItemResult,
+    SleepNoteReadResponse,
+    SleepNoteRangeResponse,
+    SleepNoteSearchHit,
+    SleepNoteSearchResponse,
+    SleepNoteStatsBucket,
+    SleepNoteStatsResponse
+)
+from src.api.utils.exports import ExportFormat
+from src.core.session import read_session, unit_of_work
 
 
 async def get_sleep_note_by_id_and_user_id(note_id: int,
                                            user_id: int,
                                            session: AsyncSession
-                                           ) -> SleepNoteSchema | None:
-    async with session.begin():
+                                           ) -> Row | None:
+    async with unit_of_work(session):
         sleep_note_dal = SleepNoteDAL(session)
         sleep_note = await sleep_note_dal.get_sleep_note_by_id_and_user_id(note_id, user_id)
-        if sleep_note is None:
-            return
-        return SleepNoteSchema.model_validate(sleep_note)
+        return sleep_note
 
 
 async def get_sleep_note_by_date_and_user_id(note_date: date,
                                              user_id: int,
                                              session: AsyncSession
-                                             ) -> SleepNoteSchema | None:
-    async with session.begin():
+                                             ) -> Row | None:
+    async with unit_of_work(session):
         sleep_note_dal = SleepNoteDAL(session)
         sleep_note = await sleep_note_dal.get_sleep_note_by_date_and_user_id(note_date, user_id)
-        if sleep_note is None:
-            return
-        return SleepNoteSchema.model_validate(sleep_note)
+        return sleep_note
+
+
+async def get_sleep_note_version_by_id_and_user_id(note_id: int, user_id: int, session: AsyncSession) -> int | None:
+    async with unit_of_work(session):
+        sleep_note_dal = SleepNoteDAL(session)
+        version = await sleep_note_dal.get_sleep_note_version_by_id_and_user_id(note_id, user_id)
+        return version
+
+
+async def get_sleep_note_version_by_date_and_user_id(note_date: date,
+                                                     user_id: int,
+                                                     session: AsyncSession
+                                                     ) -> int | None:
+    async with unit_of_work(session):
+        sleep_note_dal = SleepNoteDAL(session)
+        version = await sleep_note_dal.get_sleep_note_version_by_date_and_user_id(note_date, user_id)
+        return version
+
+
+async def get_sleep_notes_by_date_range_and_user_id(user_id: int,
+                                                    date_from: date,
+                                                    date_to: date,
+                                                    limit: int,
+                                                    after: date | None,
+                                                    session: AsyncSession
+                                                    ) -> SleepNoteRangeResponse:
+    async with unit_of_work(session):
+        sleep_note_dal = SleepNoteDAL(session)
+        rows = await sleep_note_dal.get_sleep_notes_by_date_range_and_user_id(
+            user_id,
+            date_from,
+            date_to,
+            limit + 1,
+            after
+        )
+
+    has_more = len(rows) > limit
+    notes = [SleepNoteReadResponse.model_validate(row) for row in rows[:limit]]
+    next_after = notes[-1].note_date if has_more else None
+    return SleepNoteRangeResponse(notes=notes, next_after=next_after)
+
+
+async def search_sleep_notes_by_user_id(user_id: int,
+                                        q: str,
+                                        limit: int,
+                                        offset: int,
+                                        session: AsyncSession
+                                        ) -> SleepNoteSearchResponse:
+    async with unit_of_work(session):
+        sleep_note_dal = SleepNoteDAL(session)
+        rows = await sleep_note_dal.search_sleep_notes_by_user_id(user_id, q, limit + 1, offset)
+
+    has_more = len(rows) > limit
+    notes = [SleepNoteSearchHit.model_validate(row) for row in rows[:limit]]
+    next_offset = offset + limit if has_more else None
+    return SleepNoteSearchResponse(notes=notes, next_offset=next_offset)
+
+
+async def get_sleep_note_stats_by_user_id(user_id: int,
+                                          period: Literal["week", "month"],
+                                          date_from: date,
+                                          date_to: date,
+                                          session: AsyncSession
+                                          ) -> SleepNoteStatsResponse:
+    async with unit_of_work(session):
+        sleep_note_dal = SleepNoteDAL(session)
+        rows = await sleep_note_dal.get_sleep_note_stats_by_user_id(user_id, period, date_from, date_to)
+
+    buckets = [SleepNoteStatsBucket.model_validate(row) for row in rows]
+    return SleepNoteStatsResponse(period=period, buckets=buckets)
+
+
+async def export_sleep_notes_by_user_id(user_id: int,
+                                        export_format: ExportFormat,
+                                        primary: bool = False
+                                        ) -> AsyncIterator[bytes]:
+    header = export_format.encode_header([column.key for column in sleep_note_export_columns])
+    if header:
+        yield header
+
+    async with read_session(primary) as session:
+        async with unit_of_work(session):
+            sleep_note_dal = SleepNoteDAL(session)
+            async for rows in sleep_note_dal.stream_sleep_notes_by_user_id(user_id):
+                yield export_format.encode_rows(rows)
 
 
 async def create_new_sleep_note(user_id, body: SleepNoteCreateRequest, session: AsyncSession) -> None:
-    async with session.begin():
+    async with unit_of_work(session):
         sleep_note_dal = SleepNoteDAL(session)
         await sleep_note_dal.create_sleep_note(
             body.note_date,
@@ -43,15 +140,73 @@ async def create_new_sleep_note(user_id, body: SleepNoteCreateRequest, session:
         )
 
 
+async def upsert_sleep_note(note_date: date,
+                            user_id: int,
+                            body: SleepNoteUpsertRequest,
+                            session: AsyncSession
+                            ) -> bool:
+    async with unit_of_work(session):
+        sleep_note_dal = SleepNoteDAL(session)
+        sleep_note = await sleep_note_dal.upsert_sleep_note(
+            note_date,
+            body.sleep_start,
+            body.sleep_end,
+            body.rating,
+            body.comment,
+            user_id
+        )
+        return sleep_note.created
+
+
+async def create_new_sleep_notes(user_id: int,
+                                 body: SleepNoteBatchCreateRequest,
+                                 session: AsyncSession
+                                 ) -> SleepNoteBatchCreateResponse:
+    seen_dates = set()
+    unique_notes = []
+    for note in body.notes:
+        if note.note_date not in seen_dates:
+            seen_dates.add(note.note_date)
+            unique_notes.append(note.model_dump())
+
+    async with unit_of_work(session):
+        sleep_note_dal = SleepNoteDAL(session)
+        created = await sleep_note_dal.create_sleep_notes(user_id, unique_notes)
+
+    results = []
+    claimed_dates = set()
+    for index, note in enumerate(body.notes):
+        if note.note_date in claimed_dates:
+            results.append(SleepNoteBatchItemResult(index=index, note_date=note.note_date, status="duplicate", id=None))
+            continue
+
+        claimed_dates.add(note.note_date)
+        note_id = created.get(note.note_date)
+        results.append(
+            SleepNoteBatchItemResult(
+                index=index,
+                note_date=note.note_date,
+                status="created" if note_id is not None else "conflict",
+                id=note_id
+            )
+        )
+
+    return SleepNoteBatchCreateResponse(
+        created=len(created),
+        rejected=len(body.notes) - len(created),
+        results=results
+    )
+
+
 async def delete_sleep_note_by_id_and_user_id(note_id: int, user_id: int, session: AsyncSession) -> bool:
-    async with session.begin():
+    async with unit_of_work(session):
         sleep_note_dal = SleepNoteDAL(session)
         deleted = await sleep_note_dal.delete_sleep_note_by_id_and_user_id(note_id, user_id)
         return deleted
 
 
 async def delete_sleep_note_by_date_and_user_id(note_date: date, user_id: int, session: AsyncSession) -> bool:
-    async with session.begin():
+    async with unit_of_work(session):
         sleep_note_dal = SleepNoteDAL(session)
         deleted = await sleep_note_dal.delete_sleep_note_by_date_and_user_id(note_date, user_id)
         return deleted
@@ -60,20 +215,32 @@ async def delete_sleep_note_by_date_and_user_id(note_date: date, user_id: int, s
 async def update_sleep_note_by_id_and_user_id(note_id: int,
                                               user_id: int,
                                               updated_params: dict,
-                                              session: AsyncSession
-                                              ) -> bool:
-    async with session.begin():
+                                              session: AsyncSession,
+                                              expected_versions: list[int] | None = None
+                                              ) -> int | None:
+    async with unit_of_work(session):
         sleep_note_dal = SleepNoteDAL(session)
-        updated = await sleep_note_dal.update_sleep_note_by_id_and_user_id(note_id, user_id, updated_params)
-        return updated
+        version = await sleep_note_dal.update_sleep_note_by_id_and_user_id(
+            note_id,
+            user_id,
+            updated_params,
+            expected_versions
+        )
+        return version
 
 
 async def update_sleep_note_by_date_and_user_id(note_date: date,
                                                 user_id: int,
                                                 updated_params: dict,
-                                                session: AsyncSession
-                                                ) -> bool:
-    async with session.begin():
+                                                session: AsyncSession,
+                                                expected_versions: list[int] | None = None
+                                                ) -> int | None:
+    async with unit_of_work(session):
         sleep_note_dal = SleepNoteDAL(session)
-        updated = await sleep_note_dal.update_sleep_note_by_date_and_user_id(note_date, user_id, updated_params)
-        return updated
+        version = await sleep_note_dal.update_sleep_note_by_date_and_user_id(
+            note_date,
+            user_id,
+            updated_params,
+            expected_versions
+        )
+        return version
@@ -1,21 +1,28 @@
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.dals.users import UsersDAL
 from src.api.schemas.users import UserCreateRequest, UserSchema
 from src.api.utils.passwords import hash_password
+from src.core.session import unit_of_work
 
 
-async def get_user_by_id(user_id: int, session: AsyncSession) -> UserSchema | None:
-    async with session.begin():
+async def get_user_by_id(user_id: int, session: AsyncSession) -> Row | None:
+    async with unit_of_work(session):
         user_dal = UsersDAL(session)
         user = await user_dal.get_user_by_id(user_id)
-        if user is None:
-            return
-        return UserSchema.model_validate(user)
+        return user
+
+
+async def get_user_version_by_id(user_id: int, session: AsyncSession) -> int | None:
+    async with unit_of_work(session):
+        user_dal = UsersDAL(session)
+        version = await user_dal.get_user_version_by_id(user_id)
+        return version
 
 
 async def get_user_by_username(username: str, session: AsyncSession) -> UserSchema | None:
-    async with session.begin():
+    async with unit_of_work(session):
         user_dal = UsersDAL(session)
         user = await user_dal.get_user_by_username(username)
         if user is None:
@@ -24,28 +31,26 @@ async def get_user_by_username(username: str, session: AsyncSession) -> UserSche
 
 
 async def create_new_user(body: UserCreateRequest, session: AsyncSession) -> None:
-    password_hash = hash_password(body.password)
+    password_hash = await hash_password(body.password)
 
-    async with session.begin():
+    async with unit_of_work(session):
         user_dal = UsersDAL(session)
         await user_dal.create_user(body.username, body.display_name, password_hash)
 
 
 async def delete_user_by_id(user_id: int, session: AsyncSession) -> bool:
-    async with session.begin():
+    async with unit_of_work(session):
         user_dal = UsersDAL(session)
         deleted = await user_dal.delete_user_by_id(user_id)
         return deleted
 
 
-async def update_user_by_id(user_id: int, updated_params: dict, session: AsyncSession) -> bool:
-    async with session.begin():
-        user_dal = UsersDAL(session)
-        updated = await user_dal.update_user_by_id(user_id, updated_params)
-        return updated
-
-
-async def update_user_refresh_token_by_id(user_id: int, jti: str | None, session: AsyncSession) -> None:
-    async with session.begin():
+async def update_user_by_id(user_id: int,
+                            updated_params: dict,
+                            session: AsyncSession,
+                            expected_versions: list[int] | None = None
+                            ) -> int | None:
+    async with unit_of_work(session):
         user_dal = UsersDAL(session)
-        await user_dal.update_user_refresh_token_by_id(user_id, jti)
+        version = await user_dal.update_user_by_id(user_id, updated_params, expected_versions)
+        return version
@@ -1,24 +1,64 @@
 from datetime import time
 
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, bindparam, literal_column, Boolean, Row
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.utils.cache import cached, invalidates
+from src.core.query_stats import traced_dal
+from src.core.models.base import row_version_seq
 from src.core.models.sleep_goals import SleepGoalsORM
 
+get_sleep_goal_by_user_id_query = (
+    select(SleepGoalsORM.sleep_start, SleepGoalsORM.sleep_end, SleepGoalsORM.version)
+    .where(SleepGoalsORM.user_id == bindparam("user_id"))
+)
+get_sleep_goal_version_by_user_id_query = (
+    select(SleepGoalsORM.version)
+    .where(SleepGoalsORM.user_id == bindparam("user_id"))
+)
+insert_sleep_goal_query = insert(SleepGoalsORM).values(
+    user_id=bindparam("user_id"),
+    sleep_start=bindparam("sleep_start"),
+    sleep_end=bindparam("sleep_end")
+)
+upsert_sleep_goal_query = (
+    insert_sleep_goal_query
+    .on_conflict_do_update(
+        index_elements=[SleepGoalsORM.user_id],
+        set_={
+            "sleep_start": insert_sleep_goal_query.excluded.sleep_start,
+            "sleep_end": insert_sleep_goal_query.excluded.sleep_end,
+            "version": row_version_seq.next_value()
+        }
+    )
+    .returning(literal_column("xmax = 0", Boolean).label("created"))
+)
+delete_sleep_goal_by_user_id_query = (
+    delete(SleepGoalsORM)
+    .where(SleepGoalsORM.user_id == bindparam("user_id"))
+    .returning(SleepGoalsORM.user_id)
+    .execution_options(synchronize_session=False)
+)
 
+
+@traced_dal
 class SleepGoalDAL:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_sleep_goal_by_user_id(self, user_id: int) -> SleepGoalsORM | None:
-        query = (
-            select(SleepGoalsORM)
-            .where(SleepGoalsORM.user_id == user_id)
-        )
-        result = await self.session.execute(query)
-        sleep_goal = result.scalars().first()
+    @cached("sleep_goals:{user_id}", tags=["sleep_goals:{user_id}"])
+    async def get_sleep_goal_by_user_id(self, user_id: int) -> Row | None:
+        result = await self.session.execute(get_sleep_goal_by_user_id_query, {"user_id": user_id})
+        sleep_goal = result.first()
         return sleep_goal
 
+    @cached("sleep_goals:version:{user_id}", tags=["sleep_goals:{user_id}"])
+    async def get_sleep_goal_version_by_user_id(self, user_id: int) -> int | None:
+        result = await self.session.execute(get_sleep_goal_version_by_user_id_query, {"user_id": user_id})
+        return result.scalar()
+
+    @invalidates("sleep_goals:{user_id}")
     async def create_sleep_goal(self, user_id: str, sleep_start: time, sleep_end: time) -> None:
         new_sleep_goal = SleepGoalsORM(
             user_id=user_id,
@@ -26,26 +66,33 @@ class SleepGoalDAL:
             sleep_end=sleep_end
         )
         self.session.add(new_sleep_goal)
-        await self.session.commit()
 
-    async def delete_sleep_goal_by_id(self, user_id: int) -> bool:
-        query = (
-            delete(SleepGoalsORM)
-            .where(SleepGoalsORM.user_id == user_id)
-            .returning(SleepGoalsORM.user_id)
+    @invalidates("sleep_goals:{user_id}")
+    async def upsert_sleep_goal(self, user_id: int, sleep_start: time, sleep_end: time) -> bool:
+        result = await self.session.execute(
+            upsert_sleep_goal_query,
+            {"user_id": user_id, "sleep_start": sleep_start, "sleep_end": sleep_end}
         )
-        res = await self.session.execute(query)
-        await self.session.commit()
+        return result.scalar_one()
 
+    @invalidates("sleep_goals:{user_id}")
+    async def delete_sleep_goal_by_id(self, user_id: int) -> bool:
+        res = await self.session.execute(delete_sleep_goal_by_user_id_query, {"user_id": user_id})
         return bool(res.scalars().first())
 
-    async def update_sleep_goal_by_user_id(self, user_id: int, updated_params: dict) -> bool:
+    @invalidates("sleep_goals:{user_id}")
+    async def update_sleep_goal_by_user_id(self,
+                                           user_id: int,
+                                           updated_params: dict,
+                                           expected_versions: list[int] | None = None
+                                           ) -> int | None:
         query = (
             update(SleepGoalsORM)
             .where(SleepGoalsORM.user_id == user_id)
-            .values(**updated_params)
-            .returning(SleepGoalsORM.user_id)
+            .values(**updated_params, version=row_version_seq.next_value())
+            .returning(SleepGoalsORM.version)
         )
+        if expected_versions is not None:
+            query = query.where(SleepGoalsORM.version.in_(expected_versions))
         res = await self.session.execute(query)
-        await self.session.commit()
-        return bool(res.scalars().first())
+        return res.scalar()
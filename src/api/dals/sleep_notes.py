@@ -1,33 +1,241 @@
 from datetime import date, time
+from typing import AsyncIterator, Sequence, Literal
 
-from sqlalchemy import select, delete, update, and_
+from sqlalchemy import (
+    select,
+    delete,
+    update,
+    and_,
+    bindparam,
+    Row,
+    func,
+    case,
+    cast,
+    literal,
+    literal_column,
+    Boolean,
+    Date,
+    extract
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.models.sleep_notes import SleepNotesORM
+from src.api.utils.cache import cached, invalidates
+from src.core.query_stats import traced_dal
+from src.core.models.base import row_version_seq
+from src.core.models.sleep_notes import SleepNotesORM, SEARCH_CONFIG
 
 
+SECONDS_PER_DAY = 24 * 60 * 60
+
+sleep_note_read_columns = (
+    SleepNotesORM.id,
+    SleepNotesORM.note_date,
+    SleepNotesORM.sleep_start,
+    SleepNotesORM.sleep_end,
+    SleepNotesORM.rating,
+    SleepNotesORM.comment,
+    SleepNotesORM.version
+)
+
+sleep_note_export_columns = (
+    SleepNotesORM.id,
+    SleepNotesORM.note_date,
+    SleepNotesORM.sleep_start,
+    SleepNotesORM.sleep_end,
+    SleepNotesORM.rating,
+    SleepNotesORM.comment
+)
+
+get_sleep_note_by_id_and_user_id_query = (
+    select(*sleep_note_read_columns)
+    .where(and_(SleepNotesORM.id == bindparam("note_id"), SleepNotesORM.user_id == bindparam("user_id")))
+)
+get_sleep_note_by_date_and_user_id_query = (
+    select(*sleep_note_read_columns)
+    .where(and_(SleepNotesORM.note_date == bindparam("note_date"), SleepNotesORM.user_id == bindparam("user_id")))
+)
+get_sleep_note_version_by_id_and_user_id_query = (
+    select(SleepNotesORM.version)
+    .where(and_(SleepNotesORM.id == bindparam("note_id"), SleepNotesORM.user_id == bindparam("user_id")))
+)
+get_sleep_note_version_by_date_and_user_id_query = (
+    select(SleepNotesORM.version)
+    .where(and_(SleepNotesORM.note_date == bindparam("note_date"), SleepNotesORM.user_id == bindparam("user_id")))
+)
+export_sleep_notes_by_user_id_query = (
+    select(*sleep_note_export_columns)
+    .where(SleepNotesORM.user_id == bindparam("user_id"))
+    .order_by(SleepNotesORM.note_date)
+)
+sleep_note_search_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), bindparam("q"))
+sleep_note_search_rank = func.ts_rank(SleepNotesORM.comment_search, sleep_note_search_query)
+search_sleep_notes_by_user_id_query = (
+    select(*sleep_note_read_columns, sleep_note_search_rank.label("rank"))
+    .where(
+        and_(
+            SleepNotesORM.user_id == bindparam("user_id"),
+            SleepNotesORM.comment_search.bool_op("@@")(sleep_note_search_query)
+        )
+    )
+    .order_by(sleep_note_search_rank.desc(), SleepNotesORM.note_date.desc())
+    .limit(bindparam("limit"))
+    .offset(bindparam("offset"))
+)
+insert_sleep_note_query = insert(SleepNotesORM).values(
+    note_date=bindparam("note_date"),
+    sleep_start=bindparam("sleep_start"),
+    sleep_end=bindparam("sleep_end"),
+    rating=bindparam("rating"),
+    comment=bindparam("comment"),
+    user_id=bindparam("user_id")
+)
+upsert_sleep_note_query = (
+    insert_sleep_note_query
+    .on_conflict_do_update(
+        index_elements=[SleepNotesORM.user_id, SleepNotesORM.note_date],
+        set_={
+            "sleep_start": insert_sleep_note_query.excluded.sleep_start,
+            "sleep_end": insert_sleep_note_query.excluded.sleep_end,
+            "rating": insert_sleep_note_query.excluded.rating,
+            "comment": insert_sleep_note_query.excluded.comment,
+            "version": row_version_seq.next_value()
+        }
+    )
+    .returning(SleepNotesORM.id, literal_column("xmax = 0", Boolean).label("created"))
+)
+delete_sleep_note_by_id_and_user_id_query = (
+    delete(SleepNotesORM)
+    .where(and_(SleepNotesORM.id == bindparam("note_id"), SleepNotesORM.user_id == bindparam("user_id")))
+    .returning(SleepNotesORM.user_id)
+    .execution_options(synchronize_session=False)
+)
+delete_sleep_note_by_date_and_user_id_query = (
+    delete(SleepNotesORM)
+    .where(and_(SleepNotesORM.note_date == bindparam("note_date"), SleepNotesORM.user_id == bindparam("user_id")))
+    .returning(SleepNotesORM.user_id)
+    .execution_options(synchronize_session=False)
+)
+
+
+@traced_dal
 class SleepNoteDAL:
+    batch_insert_chunk_size = 1000
+    export_chunk_size = 1000
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_sleep_note_by_id_and_user_id(self, note_id: int, user_id: int) -> SleepNotesORM | None:
+    @cached("sleep_notes:id:{user_id}:{note_id}", tags=["sleep_notes:{user_id}"])
+    async def get_sleep_note_by_id_and_user_id(self, note_id: int, user_id: int) -> Row | None:
+        result = await self.session.execute(
+            get_sleep_note_by_id_and_user_id_query,
+            {"note_id": note_id, "user_id": user_id}
+        )
+        sleep_note = result.first()
+        return sleep_note
+
+    @cached("sleep_notes:date:{user_id}:{note_date}", tags=["sleep_notes:{user_id}"])
+    async def get_sleep_note_by_date_and_user_id(self, note_date: date, user_id: int) -> Row | None:
+        result = await self.session.execute(
+            get_sleep_note_by_date_and_user_id_query,
+            {"note_date": note_date, "user_id": user_id}
+        )
+        sleep_note = result.first()
+        return sleep_note
+
+    @cached("sleep_notes:version:id:{user_id}:{note_id}", tags=["sleep_notes:{user_id}"])
+    async def get_sleep_note_version_by_id_and_user_id(self, note_id: int, user_id: int) -> int | None:
+        result = await self.session.execute(
+            get_sleep_note_version_by_id_and_user_id_query,
+            {"note_id": note_id, "user_id": user_id}
+        )
+        return result.scalar()
+
+    @cached("sleep_notes:version:date:{user_id}:{note_date}", tags=["sleep_notes:{user_id}"])
+    async def get_sleep_note_version_by_date_and_user_id(self, note_date: date, user_id: int) -> int | None:
+        result = await self.session.execute(
+            get_sleep_note_version_by_date_and_user_id_query,
+            {"note_date": note_date, "user_id": user_id}
+        )
+        return result.scalar()
+
+    async def get_sleep_notes_by_date_range_and_user_id(self,
+                                                        user_id: int,
+                                                        date_from: date,
+                                                        date_to: date,
+                                                        limit: int,
+                                                        after: date | None = None
+                                                        ) -> Sequence[Row]:
+        conditions = [
+            SleepNotesORM.user_id == user_id,
+            SleepNotesORM.note_date >= date_from,
+            SleepNotesORM.note_date <= date_to
+        ]
+        if after is not None:
+            conditions.append(SleepNotesORM.note_date > after)
+
         query = (
-            select(SleepNotesORM)
-            .where(and_(SleepNotesORM.id == note_id, SleepNotesORM.user_id == user_id))
+            select(*sleep_note_read_columns)
+            .where(and_(*conditions))
+            .order_by(SleepNotesORM.note_date)
+            .limit(limit)
         )
         result = await self.session.execute(query)
-        sleep_note = result.scalars().first()
-        return sleep_note
+        return result.all()
+
+    async def search_sleep_notes_by_user_id(self, user_id: int, q: str, limit: int, offset: int) -> Sequence[Row]:
+        result = await self.session.execute(
+            search_sleep_notes_by_user_id_query,
+            {"user_id": user_id, "q": q, "limit": limit, "offset": offset}
+        )
+        return result.all()
+
+    async def stream_sleep_notes_by_user_id(self, user_id: int) -> AsyncIterator[Sequence[Row]]:
+        result = await self.session.stream(
+            export_sleep_notes_by_user_id_query.execution_options(yield_per=self.export_chunk_size),
+            {"user_id": user_id}
+        )
+        async for partition in result.partitions():
+            yield partition
+
+    async def get_sleep_note_stats_by_user_id(self,
+                                              user_id: int,
+                                              period: Literal["week", "month"],
+                                              date_from: date,
+                                              date_to: date
+                                              ) -> Sequence[Row]:
+        start_seconds = extract("epoch", SleepNotesORM.sleep_start)
+        end_seconds = extract("epoch", SleepNotesORM.sleep_end)
+        duration_seconds = case(
+            (SleepNotesORM.sleep_end < SleepNotesORM.sleep_start, end_seconds - start_seconds + SECONDS_PER_DAY),
+            else_=end_seconds - start_seconds
+        )
+        bedtime_seconds_from_noon = func.mod(start_seconds + SECONDS_PER_DAY // 2, SECONDS_PER_DAY)
+        period_start = cast(func.date_trunc(literal(period), SleepNotesORM.note_date), Date)
 
-    async def get_sleep_note_by_date_and_user_id(self, note_date: date, user_id: int) -> SleepNotesORM | None:
         query = (
-            select(SleepNotesORM)
-            .where(and_(SleepNotesORM.note_date == note_date, SleepNotesORM.user_id == user_id))
+            select(
+                period_start.label("period_start"),
+                func.count().label("notes_count"),
+                (func.avg(duration_seconds) / 60).label("avg_duration_minutes"),
+                func.avg(SleepNotesORM.rating).label("avg_rating"),
+                (func.var_pop(bedtime_seconds_from_noon) / 3600).label("bedtime_variance_minutes_squared")
+            )
+            .where(
+                and_(
+                    SleepNotesORM.user_id == user_id,
+                    SleepNotesORM.note_date >= date_from,
+                    SleepNotesORM.note_date <= date_to
+                )
+            )
+            .group_by(literal_column("period_start"))
+            .order_by(literal_column("period_start"))
         )
         result = await self.session.execute(query)
-        sleep_note = result.scalars().first()
-        return sleep_note
+        return result.all()
 
+    @invalidates("sleep_notes:{user_id}")
     async def create_sleep_note(self,
                                 note_date: date,
                                 sleep_start: time,
@@ -45,48 +253,93 @@ class SleepNoteDAL:
             user_id=user_id
         )
         self.session.add(new_sleep_note)
-        await self.session.commit()
 
-    async def delete_sleep_note_by_id_and_user_id(self, note_id: int, user_id: int) -> bool:
-        query = (
-            delete(SleepNotesORM)
-            .where(and_(SleepNotesORM.id == note_id, SleepNotesORM.user_id == user_id))
-            .returning(SleepNotesORM.user_id)
+    @invalidates("sleep_notes:{user_id}")
+    async def create_sleep_notes(self, user_id: int, notes: list[dict]) -> dict[date, int]:
+        created = {}
+        for start in range(0, len(notes), self.batch_insert_chunk_size):
+            chunk = notes[start:start + self.batch_insert_chunk_size]
+            query = (
+                insert(SleepNotesORM)
+                .values([{**note, "user_id": user_id} for note in chunk])
+                .on_conflict_do_nothing(index_elements=[SleepNotesORM.user_id, SleepNotesORM.note_date])
+                .returning(SleepNotesORM.note_date, SleepNotesORM.id)
+            )
+            result = await self.session.execute(query)
+            created.update({note_date: note_id for note_date, note_id in result.all()})
+
+        return created
+
+    @invalidates("sleep_notes:{user_id}")
+    async def upsert_sleep_note(self,
+                                note_date: date,
+                                sleep_start: time,
+                                sleep_end: time,
+                                rating: int | None,
+                                comment: str | None,
+                                user_id: int
+                                ) -> Row:
+        result = await self.session.execute(
+            upsert_sleep_note_query,
+            {
+                "note_date": note_date,
+                "sleep_start": sleep_start,
+                "sleep_end": sleep_end,
+                "rating": rating,
+                "comment": comment,
+                "user_id": user_id
+            }
         )
-        res = await self.session.execute(query)
-        await self.session.commit()
+        return result.one()
 
+    @invalidates("sleep_notes:{user_id}")
+    async def delete_sleep_note_by_id_and_user_id(self, note_id: int, user_id: int) -> bool:
+        res = await self.session.execute(
+            delete_sleep_note_by_id_and_user_id_query,
+            {"note_id": note_id, "user_id": user_id}
+        )
         return bool(res.scalars().first())
 
+    @invalidates("sleep_notes:{user_id}")
     async def delete_sleep_note_by_date_and_user_id(self, note_date: date, user_id: int) -> bool:
-        query = (
-            delete(SleepNotesORM)
-            .where(and_(SleepNotesORM.note_date == note_date, SleepNotesORM.user_id == user_id))
-            .returning(SleepNotesORM.user_id)
+        res = await self.session.execute(
+            delete_sleep_note_by_date_and_user_id_query,
+            {"note_date": note_date, "user_id": user_id}
         )
-        res = await self.session.execute(query)
-        await self.session.commit()
-
         return bool(res.scalars().first())
 
-    async def update_sleep_note_by_id_and_user_id(self, note_id: int, user_id: int, updated_params: dict) -> bool:
+    @invalidates("sleep_notes:{user_id}")
+    async def update_sleep_note_by_id_and_user_id(self,
+                                                  note_id: int,
+                                                  user_id: int,
+                                                  updated_params: dict,
+                                                  expected_versions: list[int] | None = None
+                                                  ) -> int | None:
         query = (
             update(SleepNotesORM)
             .where(and_(SleepNotesORM.id == note_id, SleepNotesORM.user_id == user_id))
-            .values(**updated_params)
-            .returning(SleepNotesORM.user_id)
+            .values(**updated_params, version=row_version_seq.next_value())
+            .returning(SleepNotesORM.version)
         )
+        if expected_versions is not None:
+            query = query.where(SleepNotesORM.version.in_(expected_versions))
         res = await self.session.execute(query)
-        await self.session.commit()
-        return bool(res.scalars().first())
+        return res.scalar()
 
-    async def update_sleep_note_by_date_and_user_id(self, note_date: date, user_id: int, updated_params: dict) -> bool:
+    @invalidates("sleep_notes:{user_id}")
+    async def update_sleep_note_by_date_and_user_id(self,
+                                                    note_date: date,
+                                                    user_id: int,
+                                                    updated_params: dict,
+                                                    expected_versions: list[int] | None = None
+                                                    ) -> int | None:
         query = (
             update(SleepNotesORM)
             .where(and_(SleepNotesORM.note_date == note_date, SleepNotesORM.user_id == user_id))
-            .values(**updated_params)
-            .returning(SleepNotesORM.user_id)
+            .values(**updated_params, version=row_version_seq.next_value())
+            .returning(SleepNotesORM.version)
         )
+        if expected_versions is not None:
+            query = query.where(SleepNotesORM.version.in_(expected_versions))
         res = await self.session.execute(query)
-        await self.session.commit()
-        return bool(res.scalars().first())
+        return res.scalar()
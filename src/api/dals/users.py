@@ -1,28 +1,63 @@
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, and_, bindparam, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.utils.cache import cached, invalidates
+from src.core.query_stats import traced_dal
+from src.core.models.base import row_version_seq
 from src.core.models.users import UsersORM
 
+get_user_by_id_query = (
+    select(UsersORM.id, UsersORM.username, UsersORM.display_name, UsersORM.version)
+    .where(UsersORM.id == bindparam("user_id"))
+)
+get_user_version_by_id_query = (
+    select(UsersORM.version)
+    .where(UsersORM.id == bindparam("user_id"))
+)
+get_user_by_username_query = (
+    select(UsersORM)
+    .where(UsersORM.username == bindparam("username"))
+)
+delete_user_by_id_query = (
+    delete(UsersORM)
+    .where(UsersORM.id == bindparam("user_id"))
+    .returning(UsersORM.id)
+    .execution_options(synchronize_session=False)
+)
+update_user_refresh_token_by_id_query = (
+    update(UsersORM)
+    .where(UsersORM.id == bindparam("user_id"))
+    .values(refresh_token_id=bindparam("jti"))
+    .returning(UsersORM.id, UsersORM.username)
+    .execution_options(synchronize_session=False)
+)
+rotate_user_refresh_token_by_id_query = (
+    update(UsersORM)
+    .where(and_(UsersORM.id == bindparam("user_id"), UsersORM.refresh_token_id == bindparam("old_jti")))
+    .values(refresh_token_id=bindparam("new_jti"))
+    .returning(UsersORM.id, UsersORM.username)
+    .execution_options(synchronize_session=False)
+)
 
+
+@traced_dal
 class UsersDAL:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_user_by_id(self, user_id: int) -> UsersORM | None:
-        query = (
-            select(UsersORM)
-            .where(UsersORM.id == user_id)
-        )
-        result = await self.session.execute(query)
-        user = result.scalars().first()
+    @cached("users:id:{user_id}", tags=["users:{user_id}"])
+    async def get_user_by_id(self, user_id: int) -> Row | None:
+        result = await self.session.execute(get_user_by_id_query, {"user_id": user_id})
+        user = result.first()
         return user
 
+    @cached("users:version:{user_id}", tags=["users:{user_id}"])
+    async def get_user_version_by_id(self, user_id: int) -> int | None:
+        result = await self.session.execute(get_user_version_by_id_query, {"user_id": user_id})
+        return result.scalar()
+
     async def get_user_by_username(self, username: str) -> UsersORM | None:
-        query = (
-            select(UsersORM)
-            .where(UsersORM.username == username)
-        )
-        result = await self.session.execute(query)
+        result = await self.session.execute(get_user_by_username_query, {"username": username})
         user = result.scalars().first()
         return user
 
@@ -34,36 +69,38 @@ class UsersDAL:
             refresh_token_id=None
         )
         self.session.add(new_user)
-        await self.session.commit()
 
+    @invalidates("users:{user_id}", "sleep_goals:{user_id}", "sleep_notes:{user_id}")
     async def delete_user_by_id(self, user_id: int) -> bool:
-        query = (
-            delete(UsersORM)
-            .where(UsersORM.id == user_id)
-            .returning(UsersORM.id)
-        )
-        res = await self.session.execute(query)
-        await self.session.commit()
-
+        res = await self.session.execute(delete_user_by_id_query, {"user_id": user_id})
         return bool(res.scalars().first())
 
-    async def update_user_by_id(self, user_id: int, updated_params: dict) -> bool:
+    @invalidates("users:{user_id}")
+    async def update_user_by_id(self,
+                                user_id: int,
+                                updated_params: dict,
+                                expected_versions: list[int] | None = None
+                                ) -> int | None:
         query = (
             update(UsersORM)
             .where(UsersORM.id == user_id)
-            .values(**updated_params)
-            .returning(UsersORM.id)
+            .values(**updated_params, version=row_version_seq.next_value())
+            .returning(UsersORM.version)
         )
+        if expected_versions is not None:
+            query = query.where(UsersORM.version.in_(expected_versions))
         res = await self.session.execute(query)
-        await self.session.commit()
-        return bool(res.scalars().first())
+        return res.scalar()
 
-    async def update_user_refresh_token_by_id(self, user_id: int, jti: str | None) -> None:
-        query = (
-            update(UsersORM)
-            .where(UsersORM.id == user_id)
-            .values(refresh_token_id=jti)
-        )
+    @invalidates("users:{user_id}")
+    async def update_user_refresh_token_by_id(self, user_id: int, jti: str | None) -> Row | None:
+        res = await self.session.execute(update_user_refresh_token_by_id_query, {"user_id": user_id, "jti": jti})
+        return res.first()
 
-        await self.session.execute(query)
-        await self.session.commit()
+    @invalidates("users:{user_id}")
+    async def rotate_user_refresh_token_by_id(self, user_id: int, old_jti: str, new_jti: str) -> Row | None:
+        res = await self.session.execute(
+            rotate_user_refresh_token_by_id_query,
+            {"user_id": user_id, "old_jti": old_jti, "new_jti": new_jti}
+        )
+        return res.first()
@@ -0,0 +1,28 @@
+import inspect
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from src.api.dals.sleep_goals import SleepGoalDAL
+from src.api.dals.sleep_notes import SleepNoteDAL
+from src.api.dals.users import UsersDAL
+
+
+async def prepare_hot_statements(connection: AsyncConnection) -> None:
+    async with AsyncSession(bind=connection) as session:
+        user_dal = UsersDAL(session)
+        sleep_goal_dal = SleepGoalDAL(session)
+        sleep_note_dal = SleepNoteDAL(session)
+
+        await inspect.unwrap(UsersDAL.get_user_by_id)(user_dal, 0)
+        await inspect.unwrap(UsersDAL.get_user_by_username)(user_dal, "")
+        await inspect.unwrap(SleepGoalDAL.get_sleep_goal_by_user_id)(sleep_goal_dal, 0)
+        await inspect.unwrap(SleepNoteDAL.get_sleep_note_by_id_and_user_id)(sleep_note_dal, 0, 0)
+        await inspect.unwrap(SleepNoteDAL.get_sleep_note_by_date_and_user_id)(sleep_note_dal, date.min, 0)
+        await inspect.unwrap(UsersDAL.get_user_version_by_id)(user_dal, 0)
+        await inspect.unwrap(SleepGoalDAL.get_sleep_goal_version_by_user_id)(sleep_goal_dal, 0)
+        await inspect.unwrap(SleepNoteDAL.get_sleep_note_version_by_id_and_user_id)(sleep_note_dal, 0, 0)
+        await inspect.unwrap(SleepNoteDAL.get_sleep_note_version_by_date_and_user_id)(sleep_note_dal, date.min, 0)
+        await inspect.unwrap(UsersDAL.update_user_refresh_token_by_id)(user_dal, 0, None)
+        await inspect.unwrap(UsersDAL.rotate_user_refresh_token_by_id)(user_dal, 0, "", "")
+        await session.rollback()
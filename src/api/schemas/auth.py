@@ -13,10 +13,6 @@ class Tokens(BaseSchema):
     refresh_token: str
 
 
-class CreatedTokens(Tokens):
-    refresh_token_id: str
-
-
 class RefreshTokenPayload(BaseSchema):
     sub: int
     exp: int
@@ -1,4 +1,5 @@
 from datetime import date, time
+from typing import Literal
 
 from pydantic import Field
 
@@ -23,6 +24,30 @@ class SleepNoteCreateRequest(BaseSchema):
     comment: str | None = Field(..., max_length=300)
 
 
+class SleepNoteUpsertRequest(BaseSchema):
+    sleep_start: time
+    sleep_end: time
+    rating: int | None = Field(..., ge=1, le=5)
+    comment: str | None = Field(..., max_length=300)
+
+
+class SleepNoteBatchCreateRequest(BaseSchema):
+    notes: list[SleepNoteCreateRequest] = Field(..., min_length=1, max_length=10000)
+
+
+class SleepNoteBatchItemResult(BaseSchema):
+    index: int
+    note_date: date
+    status: Literal["created", "conflict", "duplicate"]
+    id: int | None
+
+
+class SleepNoteBatchCreateResponse(BaseSchema):
+    created: int
+    rejected: int
+    results: list[SleepNoteBatchItemResult]
+
+
 class SleepNoteReadResponse(BaseSchema):
     id: int
     note_date: date
@@ -32,6 +57,33 @@ class SleepNoteReadResponse(BaseSchema):
     comment: str | None
 
 
+class SleepNoteRangeResponse(BaseSchema):
+    notes: list[SleepNoteReadResponse]
+    next_after: date | None
+
+
+class SleepNoteSearchHit(SleepNoteReadResponse):
+    rank: float
+
+
+class SleepNoteSearchResponse(BaseSchema):
+    notes: list[SleepNoteSearchHit]
+    next_offset: int | None
+
+
+class SleepNoteStatsBucket(BaseSchema):
+    period_start: date
+    notes_count: int
+    avg_duration_minutes: float
+    avg_rating: float | None
+    bedtime_variance_minutes_squared: float
+
+
+class SleepNoteStatsResponse(BaseSchema):
+    period: Literal["week", "month"]
+    buckets: list[SleepNoteStatsBucket]
+
+
 class SleepNoteUpdateRequest(BaseSchema):
     note_date: date = Field(None)
     sleep_start: time = Field(None)
@@ -0,0 +1,240 @@
+import functools
+import inspect
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Callable, Iterable
+
+from src.core.config import settings
+from src.core.session import current_unit_of_work, reads_from_replica
+
+MISSING = object()
+NOT_FOUND = object()
+
+
+class CacheBackend:
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: float, tags: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class NullCache(CacheBackend):
+    def get(self, key: str) -> Any:
+        return MISSING
+
+    def set(self, key: str, value: Any, ttl_seconds: float, tags: Iterable[str]) -> None:
+        pass
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryLRUCache(CacheBackend):
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[Any, float, tuple[str, ...]]] = OrderedDict()
+        self._keys_by_tag: defaultdict[str, set[str]] = defaultdict(set)
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remove(self, key: str) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.evictions += 1
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        if value is NOT_FOUND:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float, tags: Iterable[str]) -> None:
+        if self.max_size <= 0 or ttl_seconds <= 0:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        tags = tuple(tags)
+        self._entries[key] = (value, time.monotonic() + ttl_seconds, tags)
+        for tag in tags:
+            self._keys_by_tag[tag].add(key)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0
+        }
+
+
+cache_backends: dict[str, Callable[[], CacheBackend]] = {
+    "none": NullCache,
+    "memory": lambda: InMemoryLRUCache(settings.cache.max_size)
+}
+
+dal_cache: CacheBackend = cache_backends[settings.cache.backend]()
+
+
+class FillTracker:
+    def __init__(self):
+        self._sequence = 0
+        self._pending: Counter[str] = Counter()
+        self._invalidated_at: dict[str, int] = {}
+
+    def begin(self, tags: list[str]) -> int:
+        self._pending.update(tags)
+        return self._sequence
+
+    def invalidated_since(self, tags: list[str], sequence: int) -> bool:
+        return any(self._invalidated_at.get(tag, 0) > sequence for tag in tags)
+
+    def end(self, tags: list[str]) -> None:
+        self._pending.subtract(tags)
+        for tag in tags:
+            if self._pending[tag] <= 0:
+                self._pending.pop(tag, None)
+                self._invalidated_at.pop(tag, None)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        self._sequence += 1
+        for tag in tags:
+            if tag in self._pending:
+                self._invalidated_at[tag] = self._sequence
+
+
+fill_tracker = FillTracker()
+
+
+def invalidate_tags(tags: list[str]) -> None:
+    fill_tracker.invalidate(tags)
+    dal_cache.invalidate(tags)
+
+
+def _format_templates(templates: Iterable[str], arguments: dict) -> list[str]:
+    formatted = []
+    for template in templates:
+        try:
+            formatted.append(template.format(**arguments))
+        except (KeyError, TypeError):
+            continue
+    return formatted
+
+
+def cached(key: str, tags: Iterable[str] = ()) -> Callable:
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            arguments = signature.bind(self, *args, **kwargs).arguments
+            cache_key = key.format(**arguments)
+            value = dal_cache.get(cache_key)
+            if value is NOT_FOUND:
+                return None
+            if value is not MISSING:
+                return value
+
+            entry_tags = _format_templates(tags, arguments)
+            fill_sequence = fill_tracker.begin(entry_tags)
+            try:
+                value = await method(self, *args, **kwargs)
+                stale = fill_tracker.invalidated_since(entry_tags, fill_sequence)
+            finally:
+                fill_tracker.end(entry_tags)
+            if stale or reads_from_replica(self.session):
+                return value
+
+            active_unit_of_work = current_unit_of_work(self.session)
+            if active_unit_of_work is not None:
+                uncommitted_tags = active_unit_of_work.info.get("invalidated_tags", set())
+                if not uncommitted_tags.isdisjoint(entry_tags):
+                    return value
+
+            if value is None:
+                dal_cache.set(cache_key, NOT_FOUND, settings.cache.negative_ttl_seconds, entry_tags)
+                return value
+
+            dal_cache.set(cache_key, value, settings.cache.ttl_seconds, entry_tags)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*tags: str) -> Callable:
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            arguments = signature.bind(self, *args, **kwargs).arguments
+            invalidated_tags = _format_templates(tags, arguments)
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                invalidate_tags(invalidated_tags)
+                active_unit_of_work = current_unit_of_work(self.session)
+                if active_unit_of_work is not None:
+                    active_unit_of_work.info.setdefault("invalidated_tags", set()).update(invalidated_tags)
+                    active_unit_of_work.after_commit(lambda: invalidate_tags(invalidated_tags))
+
+        return wrapper
+
+    return decorator
@@ -1,43 +1,44 @@
 from fastapi import FastAPI
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, TimeoutError as PoolTimeoutError
 from starlette import status
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from src.api.schemas.errors import DatabaseErrorResponse, DatabaseErrorDetail
 from src.api.utils.constraints import constraints
+from src.api.utils.serializers import database_error_serializer
+from src.core.pool import PoolSaturatedError
+
+constraint_error_details = {
+    constraint_name: DatabaseErrorDetail(
+        error_type=constraint_info.type.value,
+        table=constraint_info.table,
+        fields=constraint_info.fields,
+    )
+    for constraint_name, constraint_info in constraints.items()
+}
+unknown_error_detail = DatabaseErrorDetail(
+    error_type="unknown",
+    table="unknown",
+    fields=["unknown"],
+)
 
 
 def register_exception_handlers(app: FastAPI):
     @app.exception_handler(IntegrityError)
-    def handle_database_error(request: Request, e: IntegrityError) -> JSONResponse:
+    def handle_database_error(request: Request, e: IntegrityError) -> Response:
         error_message = str(e.orig)
-        errors = []
-
-        for constraint_name, constraint_info in constraints.items():
-            if constraint_name in error_message:
-                errors.append(
-                    DatabaseErrorDetail(
-                        error_type=constraint_info.type.value,
-                        table=constraint_info.table,
-                        fields=constraint_info.fields,
-                    )
-                )
+        errors = [
+            error_detail
+            for constraint_name, error_detail in constraint_error_details.items()
+            if constraint_name in error_message
+        ]
 
         if not errors:
-            errors.append(
-                DatabaseErrorDetail(
-                    error_type="unknown",
-                    table="unknown",
-                    fields=["unknown"],
-                )
-            )
+            errors.append(unknown_error_detail)
 
         response = DatabaseErrorResponse(detail=errors)
-        return JSONResponse(
-            content=response.model_dump(),
-            status_code=status.HTTP_409_CONFLICT
-        )
+        return database_error_serializer.response(response, status_code=status.HTTP_409_CONFLICT)
 
     @app.exception_handler(OSError)
     async def os_error_handler(request: Request, e: OSError) -> JSONResponse:
@@ -45,3 +46,19 @@ def register_exception_handlers(app: FastAPI):
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={"detail": "Database is unavailable"},
         )
+
+    @app.exception_handler(PoolSaturatedError)
+    async def pool_saturated_handler(request: Request, e: PoolSaturatedError) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Database is overloaded"},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    @app.exception_handler(PoolTimeoutError)
+    async def pool_timeout_handler(request: Request, e: PoolTimeoutError) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Database is overloaded"},
+            headers={"Retry-After": "1"},
+        )
@@ -0,0 +1,36 @@
+from starlette.responses import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+
+def make_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def etag_headers(version: int) -> dict[str, str]:
+    return {"ETag": make_etag(version)}
+
+
+def _entity_tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def if_none_match_satisfied(if_none_match: str, version: int) -> bool:
+    etag = make_etag(version)
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in _entity_tags(if_none_match))
+
+
+def parse_if_match(if_match: str | None) -> list[int] | None:
+    if if_match is None:
+        return None
+
+    versions = []
+    for tag in _entity_tags(if_match):
+        if tag == "*":
+            return None
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return versions
+
+
+def not_modified(version: int) -> Response:
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers=etag_headers(version))
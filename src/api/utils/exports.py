@@ -0,0 +1,35 @@
+import csv
+import io
+from typing import Callable, Sequence
+
+import orjson
+from sqlalchemy import Row
+
+
+class ExportFormat:
+    def __init__(self,
+                 media_type: str,
+                 extension: str,
+                 encode_header: Callable[[Sequence[str]], bytes],
+                 encode_rows: Callable[[Sequence[Row]], bytes]
+                 ):
+        self.media_type = media_type
+        self.extension = extension
+        self.encode_header = encode_header
+        self.encode_rows = encode_rows
+
+
+def _encode_csv_rows(rows: Sequence[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_ndjson_rows(rows: Sequence[Row]) -> bytes:
+    return b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+
+export_formats: dict[str, ExportFormat] = {
+    "csv": ExportFormat("text/csv", "csv", lambda columns: _encode_csv_rows([columns]), _encode_csv_rows),
+    "ndjson": ExportFormat("application/x-ndjson", "ndjson", lambda columns: b"", _encode_ndjson_rows)
+}
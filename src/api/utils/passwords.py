@@ -1,11 +1,105 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
 import bcrypt
+from fastapi import HTTPException
+from starlette import status
+
+from src.core.config import settings
 
 
-def hash_password(password: str) -> str:
+def _hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
     password_hash = bcrypt.hashpw(password.encode(), salt)
     return password_hash.hex()
 
 
-def validate_password(password: str, password_hash: str) -> bool:
+def _validate_password(password: str, password_hash: str) -> bool:
     return bcrypt.checkpw(password.encode(), bytes.fromhex(password_hash))
+
+
+class PasswordHasher:
+    def __init__(self, executor_type: str, workers: int, max_pending: int):
+        self.executor_type = executor_type
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func: Callable, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password hashing is overloaded",
+                headers={"Retry-After": "1"}
+            )
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            self.total_seconds += time.perf_counter() - start
+
+        self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(_validate_password, password, password_hash)
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_seconds": self.total_seconds / finished if finished else 0.0
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    settings.hashing.executor,
+    settings.hashing.workers,
+    settings.hashing.max_pending
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def validate_password(password: str, password_hash: str) -> bool:
+    return await password_hasher.verify(password, password_hash)
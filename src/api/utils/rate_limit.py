@@ -0,0 +1,118 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from fastapi import HTTPException, Request
+from starlette import status
+
+from src.api.utils.tokens import decode_access_token
+from src.core.config import settings
+
+
+class RateLimitStore:
+    async def consume(self, key: str, rate: float, burst: int) -> float:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class NullRateLimitStore(RateLimitStore):
+    async def consume(self, key: str, rate: float, burst: int) -> float:
+        return 0.0
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, updated_at: float):
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+
+class InMemoryTokenBucketStore(RateLimitStore):
+    def __init__(self, max_buckets: int, idle_seconds: float):
+        self.max_buckets = max_buckets
+        self.idle_seconds = idle_seconds
+        self._buckets: OrderedDict[str, _TokenBucket] = OrderedDict()
+
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if len(self._buckets) <= self.max_buckets and now - oldest.updated_at < self.idle_seconds:
+                break
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+
+    async def consume(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _TokenBucket(burst, now)
+        else:
+            bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated_at) * rate)
+            bucket.updated_at = now
+            self._buckets.move_to_end(key)
+        self._evict(now)
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            self.allowed += 1
+            return 0.0
+
+        self.limited += 1
+        return (1 - bucket.tokens) / rate
+
+    def stats(self) -> dict:
+        return {
+            "buckets": len(self._buckets),
+            "max_buckets": self.max_buckets,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions
+        }
+
+
+rate_limit_stores: dict[str, Callable[[], RateLimitStore]] = {
+    "none": NullRateLimitStore,
+    "memory": lambda: InMemoryTokenBucketStore(settings.rate_limit.max_buckets, settings.rate_limit.idle_seconds)
+}
+
+rate_limit_store: RateLimitStore = rate_limit_stores[settings.rate_limit.backend]()
+
+ip_keyed_routes = frozenset(settings.rate_limit.ip_routes)
+
+
+def _client_identity(request: Request, route_key: str) -> str:
+    if route_key not in ip_keyed_routes:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                return f"user:{decode_access_token(token).sub}"
+            except HTTPException:
+                pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def rate_limit(request: Request) -> None:
+    route = request.scope.get("route")
+    route_key = f"{request.method} {getattr(route, 'path', request.url.path)}"
+    limit = settings.rate_limit.routes.get(route_key)
+    rate = limit.rate if limit is not None else settings.rate_limit.rate
+    burst = limit.burst if limit is not None else settings.rate_limit.burst
+    if rate <= 0:
+        return
+
+    key = f"{route_key}|{_client_identity(request, route_key)}"
+    retry_after = await rate_limit_store.consume(key, rate, burst)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
@@ -0,0 +1,36 @@
+import math
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+from src.core.replicas import READ_YOUR_WRITES_COOKIE, WriteMarker, request_write_marker
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.max_age = math.ceil(settings.db.read_your_writes_seconds) if settings.db.replicas else 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.max_age <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        marker = WriteMarker()
+        marker_token = request_write_marker.set(marker)
+
+        async def send_with_write_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and marker.wrote_at is not None:
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={marker.wrote_at:.3f}; "
+                    f"Max-Age={self.max_age}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_write_cookie)
+        finally:
+            request_write_marker.reset(marker_token)
@@ -0,0 +1,37 @@
+from typing import Any
+
+from pydantic import TypeAdapter
+from starlette.responses import Response
+from starlette.status import HTTP_200_OK
+
+from src.api.schemas.auth import Tokens
+from src.api.schemas.errors import DatabaseErrorResponse
+from src.api.schemas.sleep_goals import SleepGoalReadResponse
+from src.api.schemas.sleep_notes import SleepNoteReadResponse
+from src.api.schemas.users import UserReadResponse
+from src.core.metrics import PhaseTimer
+
+
+class ResponseSerializer:
+    media_type = "application/json"
+
+    def __init__(self, model: type):
+        self.adapter = TypeAdapter(model)
+
+    def response(self, value: Any, status_code: int = HTTP_200_OK, headers: dict | None = None) -> Response:
+        with PhaseTimer("serialize"):
+            validated = self.adapter.validate_python(value, from_attributes=True)
+            content = self.adapter.dump_json(validated)
+        return Response(
+            content=content,
+            status_code=status_code,
+            headers=headers,
+            media_type=self.media_type
+        )
+
+
+sleep_note_read_serializer = ResponseSerializer(SleepNoteReadResponse)
+sleep_goal_read_serializer = ResponseSerializer(SleepGoalReadResponse)
+user_read_serializer = ResponseSerializer(UserReadResponse)
+tokens_serializer = ResponseSerializer(Tokens)
+database_error_serializer = ResponseSerializer(DatabaseErrorResponse)
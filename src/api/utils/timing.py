@@ -0,0 +1,51 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import request_duration, request_phase_duration, request_queries, request_timings
+from src.core.query_stats import QueryStats, request_query_stats, check_query_budget
+
+PHASES = ("auth", "pool", "db", "serialize")
+
+
+class TimingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        query_stats = QueryStats()
+        timings_token = request_timings.set(timings)
+        query_stats_token = request_query_stats.set(query_stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_server_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                entries = [f"{phase};dur={timings[phase] * 1000:.3f}" for phase in PHASES if phase in timings]
+                entries.append(f'queries;desc="{query_stats.count} statements, {query_stats.rows} rows"')
+                entries.append(f"total;dur={(time.perf_counter() - start) * 1000:.3f}")
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", ", ".join(entries).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            request_timings.reset(timings_token)
+            request_query_stats.reset(query_stats_token)
+            route = scope.get("route")
+            route_template = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            request_duration.observe((method, route_template, str(status_code)), time.perf_counter() - start)
+            for phase, seconds in timings.items():
+                request_phase_duration.observe((method, route_template, phase), seconds)
+            request_queries.observe((method, route_template), query_stats.count)
+            check_query_budget(method, route_template, query_stats)
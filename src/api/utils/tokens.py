@@ -1,3 +1,6 @@
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 import jwt
@@ -7,6 +10,72 @@ from starlette import status
 
 from src.api.schemas.auth import RefreshTokenPayload, AccessTokenPayload
 from src.core.config import settings
+from src.core.metrics import PhaseTimer
+
+invalid_token = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid token"
+)
+malformed_token = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Malformed token"
+)
+
+
+class AccessTokenCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, AccessTokenPayload] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> AccessTokenPayload | None:
+        key = self._key(token)
+        payload = self._entries.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+
+        if payload.exp <= time.time():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: AccessTokenPayload) -> None:
+        if self.max_size <= 0:
+            return
+
+        key = self._key(token)
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+access_token_cache = AccessTokenCache(settings.jwt.access_token_cache_size)
 
 
 def create_access_token(user_id: int,
@@ -38,15 +107,6 @@ def create_refresh_token(user_id: int,
 
 
 def decode_token(token: str) -> dict:
-    invalid_token = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid token"
-    )
-    malformed_token = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Malformed token"
-    )
-
     try:
         payload = jwt.decode(token, settings.jwt.secret_key, algorithms=[settings.jwt.algorithm])
     except jwt.InvalidSignatureError:
@@ -60,21 +120,27 @@ def decode_token(token: str) -> dict:
 
 
 def decode_access_token(token: str) -> AccessTokenPayload:
-    token_data = decode_token(token)
-    try:
-        payload = AccessTokenPayload(**token_data)
-    except ValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token data"
-        )
-    if payload.type != "access":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token type. Expected: 'access'"
-        )
-
-    return payload
+    with PhaseTimer("auth"):
+        cached_payload = access_token_cache.get(token)
+        if cached_payload is not None:
+            return cached_payload
+
+        token_data = decode_token(token)
+        try:
+            payload = AccessTokenPayload(**token_data)
+        except ValidationError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token data"
+            )
+        if payload.type != "access":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token type. Expected: 'access'"
+            )
+
+        access_token_cache.put(token, payload)
+        return payload
 
 
 def decode_refresh_token(token: str) -> RefreshTokenPayload:
@@ -2,7 +2,8 @@ from fastapi import HTTPException
 from fastapi.security import HTTPBearer
 from starlette.status import (
     HTTP_404_NOT_FOUND,
-    HTTP_400_BAD_REQUEST
+    HTTP_400_BAD_REQUEST,
+    HTTP_412_PRECONDITION_FAILED
 )
 
 from src.api.schemas.errors import CommonErrorResponse, DatabaseErrorResponse
@@ -25,9 +26,19 @@ no_parameters = HTTPException(
     status_code=HTTP_400_BAD_REQUEST,
     detail="At least one specified parameter for update should be provided",
 )
+invalid_date_range = HTTPException(
+    status_code=HTTP_400_BAD_REQUEST,
+    detail="'from' date should not be later than 'to' date",
+)
+precondition_failed = HTTPException(
+    status_code=HTTP_412_PRECONDITION_FAILED,
+    detail="Resource has been modified",
+)
 
 no_body_successful_200_info = {"description": "Successful Response"}
 no_body_successful_201_info = {"description": "Successful Response"}
+not_modified_info = {"description": "Not Modified"}
+precondition_failed_info = {"model": CommonErrorResponse, "description": "Precondition failed"}
 bad_request_info = {"model": CommonErrorResponse, "description": "Bad request"}
 forbidden_info = {"model": CommonErrorResponse, "description": "Forbidden"}
 user_not_found_info = {"model": CommonErrorResponse, "description": "User not found"}
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
 from fastapi.security import HTTPAuthorizationCredentials
+from starlette.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.status import (
     HTTP_201_CREATED,
@@ -9,9 +10,9 @@ from starlette.status import (
     HTTP_403_FORBIDDEN
 )
 
-from src.api.actions.auth import authenticate_user_by_password, create_tokens, authenticate_user_by_refresh_token
-from src.api.actions.users import update_user_refresh_token_by_id
+from src.api.actions.auth import login_user, refresh_user_tokens
 from src.api.schemas.auth import Tokens, LoginData
+from src.api.utils.serializers import tokens_serializer
 from src.api.views import (
     http_bearer,
     no_database_connection_info,
@@ -45,25 +46,15 @@ refresh_responses = {
 @auth_router.post("/login/", response_model=Tokens, status_code=HTTP_201_CREATED, responses=login_responses)
 async def login(body: LoginData,
                 session: AsyncSession = Depends(get_session)
-                ) -> Tokens:
-    user = await authenticate_user_by_password(body, session)
-    tokens_info = create_tokens(user)
-    await update_user_refresh_token_by_id(user.id, tokens_info.refresh_token_id, session)
-    return Tokens(
-        access_token=tokens_info.access_token,
-        refresh_token=tokens_info.refresh_token
-    )
+                ) -> Response:
+    tokens = await login_user(body, session)
+    return tokens_serializer.response(tokens, status_code=HTTP_201_CREATED)
 
 
 @auth_router.post("/refresh/", response_model=Tokens, status_code=HTTP_201_CREATED, responses=refresh_responses)
 async def refresh_token(credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
                         session: AsyncSession = Depends(get_session)
-                        ) -> Tokens:
+                        ) -> Response:
     token = credentials.credentials
-    user = await authenticate_user_by_refresh_token(token, session)
-    tokens_info = create_tokens(user)
-    await update_user_refresh_token_by_id(user.id, tokens_info.refresh_token_id, session)
-    return Tokens(
-        access_token=tokens_info.access_token,
-        refresh_token=tokens_info.refresh_token
-    )
+    tokens = await refresh_user_tokens(token, session)
+    return tokens_serializer.response(tokens, status_code=HTTP_201_CREATED)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Request, Response
+from starlette.status import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+
+health_router = APIRouter(prefix='/health', tags=["Health"])
+
+
+@health_router.get("/live", status_code=HTTP_200_OK, response_class=Response)
+async def live() -> Response:
+    return Response(status_code=HTTP_200_OK)
+
+
+@health_router.get("/ready", status_code=HTTP_200_OK, response_class=Response)
+async def ready(request: Request) -> Response:
+    if not getattr(request.app.state, "ready", False):
+        return Response(status_code=HTTP_503_SERVICE_UNAVAILABLE)
+    return Response(status_code=HTTP_200_OK)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from starlette.responses import PlainTextResponse
+from starlette.status import HTTP_200_OK
+
+from src.api.utils.cache import dal_cache
+from src.api.utils.passwords import password_hasher
+from src.api.utils.rate_limit import rate_limit_store
+from src.api.utils.tokens import access_token_cache
+from src.core.metrics import metrics_registry
+from src.core.pool import pool_monitor
+from src.core.replicas import replica_router
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+metrics_registry.add_stats_collector(
+    "password_hasher", password_hasher.stats, ("completed", "failed", "rejected")
+)
+metrics_registry.add_stats_collector(
+    "access_token_cache", access_token_cache.stats, ("hits", "misses", "evictions")
+)
+metrics_registry.add_stats_collector(
+    "dal_cache", dal_cache.stats, ("hits", "negative_hits", "misses", "evictions", "invalidations")
+)
+metrics_registry.add_stats_collector("db_pool", pool_monitor.stats, ("admitted", "rejected"))
+metrics_registry.add_stats_collector(
+    "db_replicas", replica_router.stats, ("primary_reads", "replica_reads", "sticky_reads")
+)
+metrics_registry.add_stats_collector("rate_limiter", rate_limit_store.stats, ("allowed", "limited", "evictions"))
+
+
+@metrics_router.get("/metrics", status_code=HTTP_200_OK, response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,30 +1,39 @@
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Header, Response
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
+    HTTP_304_NOT_MODIFIED,
     HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
     HTTP_409_CONFLICT,
     HTTP_503_SERVICE_UNAVAILABLE,
     HTTP_401_UNAUTHORIZED,
-    HTTP_403_FORBIDDEN
+    HTTP_403_FORBIDDEN,
+    HTTP_412_PRECONDITION_FAILED
 )
 
 from src.api.actions.sleep_goals import (
     get_sleep_goal_by_user_id,
+    get_sleep_goal_version_by_user_id,
     create_new_sleep_goal,
+    upsert_sleep_goal,
     delete_sleep_goal_by_id,
     update_sleep_goal_by_id
 )
 from src.api.schemas.errors import CommonErrorResponse
 from src.api.schemas.sleep_goals import SleepGoalReadResponse, SleepGoalCreateRequest, SleepGoalUpdateRequest
+from src.api.utils.etags import etag_headers, if_none_match_satisfied, not_modified, parse_if_match
+from src.api.utils.serializers import sleep_goal_read_serializer
 from src.api.utils.tokens import decode_access_token
 from src.api.views import (
     http_bearer,
     no_parameters,
+    precondition_failed,
     sleep_goal_not_found,
+    not_modified_info,
+    precondition_failed_info,
     no_database_connection_info,
     database_conflict_info,
     no_body_successful_200_info,
@@ -33,7 +42,7 @@ from src.api.views import (
     unauthorized_info,
     forbidden_info
 )
-from src.core.session import get_session
+from src.core.session import get_session, get_read_session
 
 sleep_goals_router = APIRouter(prefix='/goals', tags=["Sleep Goals"])
 
@@ -42,6 +51,7 @@ sleep_goal_not_found_info = {"model": CommonErrorResponse, "description": "Sleep
 
 get_sleep_goal_responses = {
     HTTP_200_OK: successful_sleep_goal_read_info,
+    HTTP_304_NOT_MODIFIED: not_modified_info,
     HTTP_401_UNAUTHORIZED: unauthorized_info,
     HTTP_403_FORBIDDEN: forbidden_info,
     HTTP_404_NOT_FOUND: sleep_goal_not_found_info,
@@ -56,6 +66,15 @@ create_sleep_goal_responses = {
     HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
 }
 
+upsert_sleep_goal_responses = {
+    HTTP_200_OK: no_body_successful_200_info,
+    HTTP_201_CREATED: no_body_successful_201_info,
+    HTTP_401_UNAUTHORIZED: unauthorized_info,
+    HTTP_403_FORBIDDEN: forbidden_info,
+    HTTP_409_CONFLICT: database_conflict_info,
+    HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
+}
+
 delete_sleep_goal_responses = {
     HTTP_200_OK: no_body_successful_200_info,
     HTTP_401_UNAUTHORIZED: unauthorized_info,
@@ -71,22 +90,29 @@ update_sleep_goal_responses = {
     HTTP_403_FORBIDDEN: forbidden_info,
     HTTP_404_NOT_FOUND: sleep_goal_not_found_info,
     HTTP_409_CONFLICT: database_conflict_info,
+    HTTP_412_PRECONDITION_FAILED: precondition_failed_info,
     HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
 }
 
 
 @sleep_goals_router.get("/", status_code=HTTP_200_OK,
                         response_model=SleepGoalReadResponse, responses=get_sleep_goal_responses)
-async def get_sleep_goal(credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
-                         session: AsyncSession = Depends(get_session)
-                         ) -> SleepGoalReadResponse:
+async def get_sleep_goal(if_none_match: str | None = Header(None),
+                         credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+                         session: AsyncSession = Depends(get_read_session)
+                         ) -> Response:
     token = credentials.credentials
     payload = decode_access_token(token)
+    if if_none_match is not None:
+        version = await get_sleep_goal_version_by_user_id(payload.sub, session)
+        if version is not None and if_none_match_satisfied(if_none_match, version):
+            return not_modified(version)
+
     sleep_goal = await get_sleep_goal_by_user_id(payload.sub, session)
     if sleep_goal is None:
         raise sleep_goal_not_found
 
-    return SleepGoalReadResponse.model_validate(sleep_goal)
+    return sleep_goal_read_serializer.response(sleep_goal, headers=etag_headers(sleep_goal.version))
 
 
 @sleep_goals_router.post("/", status_code=HTTP_201_CREATED,
@@ -101,6 +127,18 @@ async def create_sleep_goal(body: SleepGoalCreateRequest,
     return Response(status_code=HTTP_201_CREATED)
 
 
+@sleep_goals_router.put("/", status_code=HTTP_200_OK,
+                        response_class=Response, responses=upsert_sleep_goal_responses)
+async def put_sleep_goal(body: SleepGoalCreateRequest,
+                         credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+                         session: AsyncSession = Depends(get_session)
+                         ) -> Response:
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    created = await upsert_sleep_goal(payload.sub, body, session)
+    return Response(status_code=HTTP_201_CREATED if created else HTTP_200_OK)
+
+
 @sleep_goals_router.delete("/", status_code=HTTP_200_OK,
                            response_class=Response, responses=delete_sleep_goal_responses)
 async def delete_sleep_goal(credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
@@ -118,6 +156,7 @@ async def delete_sleep_goal(credentials: HTTPAuthorizationCredentials = Depends(
 @sleep_goals_router.patch("/", status_code=HTTP_200_OK,
                           response_class=Response, responses=update_sleep_goal_responses)
 async def update_sleep_goal(body: SleepGoalUpdateRequest,
+                            if_match: str | None = Header(None),
                             credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
                             session: AsyncSession = Depends(get_session)
                             ) -> Response:
@@ -127,8 +166,10 @@ async def update_sleep_goal(body: SleepGoalUpdateRequest,
     if not updated_sleep_goal_params:
         raise no_parameters
 
-    updated = await update_sleep_goal_by_id(payload.sub, updated_sleep_goal_params, session)
-    if not updated:
+    version = await update_sleep_goal_by_id(payload.sub, updated_sleep_goal_params, session, parse_if_match(if_match))
+    if version is None:
+        if if_match is not None and await get_sleep_goal_version_by_user_id(payload.sub, session) is not None:
+            raise precondition_failed
         raise sleep_goal_not_found
 
-    return Response(status_code=HTTP_200_OK)
+    return Response(status_code=HTTP_200_OK, headers=etag_headers(version))
@@ -1,35 +1,60 @@
 from datetime import date
+from typing import Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Request
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 from starlette.status import (
     HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
     HTTP_400_BAD_REQUEST,
     HTTP_401_UNAUTHORIZED,
     HTTP_404_NOT_FOUND,
     HTTP_503_SERVICE_UNAVAILABLE,
     HTTP_201_CREATED,
     HTTP_409_CONFLICT,
-    HTTP_403_FORBIDDEN
+    HTTP_403_FORBIDDEN,
+    HTTP_412_PRECONDITION_FAILED
 )
 
 from src.api.actions.sleep_notes import (
     get_sleep_note_by_id_and_user_id,
+    get_sleep_notes_by_date_range_and_user_id,
+    get_sleep_note_stats_by_user_id,
+    search_sleep_notes_by_user_id,
+    export_sleep_notes_by_user_id,
     get_sleep_note_by_date_and_user_id,
+    get_sleep_note_version_by_id_and_user_id,
+    get_sleep_note_version_by_date_and_user_id,
     create_new_sleep_note,
+    create_new_sleep_notes,
+    upsert_sleep_note,
     delete_sleep_note_by_id_and_user_id,
     delete_sleep_note_by_date_and_user_id,
     update_sleep_note_by_id_and_user_id,
     update_sleep_note_by_date_and_user_id
 )
 from src.api.schemas.errors import CommonErrorResponse
-from src.api.schemas.sleep_notes import SleepNoteReadResponse, SleepNoteCreateRequest, SleepNoteUpdateRequest
+from src.api.schemas.sleep_notes import (
+    SleepNoteReadResponse,
+    SleepNoteCreateRequest,
+    SleepNoteUpsertRequest,
+    SleepNoteUpdateRequest,
+    SleepNoteRangeResponse,
+    SleepNoteSearchResponse,
+    SleepNoteStatsResponse,
+    SleepNoteBatchCreateRequest,
+    SleepNoteBatchCreateResponse
+)
+from src.api.utils.etags import etag_headers, if_none_match_satisfied, not_modified, parse_if_match
+from src.api.utils.exports import export_formats
+from src.api.utils.serializers import sleep_note_read_serializer
 from src.api.utils.tokens import decode_access_token
 from src.api.views import (
     http_bearer,
     bad_request_info,
+    invalid_date_range,
     unauthorized_info,
     sleep_note_not_found,
     no_database_connection_info,
@@ -37,23 +62,64 @@ from src.api.views import (
     database_conflict_info,
     no_body_successful_200_info,
     no_parameters,
+    precondition_failed,
+    not_modified_info,
+    precondition_failed_info,
     forbidden_info
 )
-from src.core.session import get_session
+from src.core.session import get_session, get_read_session, reads_own_writes
 
 sleep_notes_router = APIRouter(prefix='/notes', tags=["Sleep Notes"])
 
 successful_sleep_note_read_info = {"model": SleepNoteReadResponse, "description": "Successful Response"}
+successful_sleep_note_range_info = {"model": SleepNoteRangeResponse, "description": "Successful Response"}
+successful_sleep_note_search_info = {"model": SleepNoteSearchResponse, "description": "Successful Response"}
+successful_sleep_note_stats_info = {"model": SleepNoteStatsResponse, "description": "Successful Response"}
+successful_sleep_note_batch_info = {"model": SleepNoteBatchCreateResponse, "description": "Successful Response"}
 sleep_note_not_found_info = {"model": CommonErrorResponse, "description": "Sleep note not found"}
 
 get_sleep_goal_responses = {
     HTTP_200_OK: successful_sleep_note_read_info,
+    HTTP_304_NOT_MODIFIED: not_modified_info,
     HTTP_401_UNAUTHORIZED: unauthorized_info,
     HTTP_403_FORBIDDEN: forbidden_info,
     HTTP_404_NOT_FOUND: sleep_note_not_found_info,
     HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
 }
 
+get_sleep_note_range_responses = {
+    HTTP_200_OK: successful_sleep_note_range_info,
+    HTTP_400_BAD_REQUEST: bad_request_info,
+    HTTP_401_UNAUTHORIZED: unauthorized_info,
+    HTTP_403_FORBIDDEN: forbidden_info,
+    HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
+}
+
+export_sleep_notes_responses = {
+    HTTP_200_OK: {
+        "description": "Successful Response",
+        "content": {export_format.media_type: {} for export_format in export_formats.values()}
+    },
+    HTTP_401_UNAUTHORIZED: unauthorized_info,
+    HTTP_403_FORBIDDEN: forbidden_info,
+    HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
+}
+
+search_sleep_notes_responses = {
+    HTTP_200_OK: successful_sleep_note_search_info,
+    HTTP_401_UNAUTHORIZED: unauthorized_info,
+    HTTP_403_FORBIDDEN: forbidden_info,
+    HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
+}
+
+get_sleep_note_stats_responses = {
+    HTTP_200_OK: successful_sleep_note_stats_info,
+    HTTP_400_BAD_REQUEST: bad_request_info,
+    HTTP_401_UNAUTHORIZED: unauthorized_info,
+    HTTP_403_FORBIDDEN: forbidden_info,
+    HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
+}
+
 create_sleep_goal_responses = {
     HTTP_201_CREATED: no_body_successful_201_info,
     HTTP_401_UNAUTHORIZED: unauthorized_info,
@@ -62,6 +128,23 @@ create_sleep_goal_responses = {
     HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
 }
 
+upsert_sleep_note_responses = {
+    HTTP_200_OK: no_body_successful_200_info,
+    HTTP_201_CREATED: no_body_successful_201_info,
+    HTTP_401_UNAUTHORIZED: unauthorized_info,
+    HTTP_403_FORBIDDEN: forbidden_info,
+    HTTP_409_CONFLICT: database_conflict_info,
+    HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
+}
+
+create_sleep_note_batch_responses = {
+    HTTP_201_CREATED: successful_sleep_note_batch_info,
+    HTTP_401_UNAUTHORIZED: unauthorized_info,
+    HTTP_403_FORBIDDEN: forbidden_info,
+    HTTP_409_CONFLICT: database_conflict_info,
+    HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
+}
+
 delete_sleep_note_responses = {
     HTTP_200_OK: no_body_successful_200_info,
     HTTP_401_UNAUTHORIZED: unauthorized_info,
@@ -77,38 +160,113 @@ update_sleep_note_responses = {
     HTTP_403_FORBIDDEN: forbidden_info,
     HTTP_404_NOT_FOUND: sleep_note_not_found_info,
     HTTP_409_CONFLICT: database_conflict_info,
+    HTTP_412_PRECONDITION_FAILED: precondition_failed_info,
     HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
 }
 
 
+@sleep_notes_router.get("/range", status_code=HTTP_200_OK,
+                        response_model=SleepNoteRangeResponse, responses=get_sleep_note_range_responses)
+async def get_sleep_notes_by_date_range(date_from: date = Query(..., alias="from"),
+                                        date_to: date = Query(..., alias="to"),
+                                        limit: int = Query(31, ge=1, le=366),
+                                        after: date | None = Query(None),
+                                        credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+                                        session: AsyncSession = Depends(get_read_session)
+                                        ) -> SleepNoteRangeResponse:
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    if date_from > date_to:
+        raise invalid_date_range
+
+    return await get_sleep_notes_by_date_range_and_user_id(payload.sub, date_from, date_to, limit, after, session)
+
+
+@sleep_notes_router.get("/stats", status_code=HTTP_200_OK,
+                        response_model=SleepNoteStatsResponse, responses=get_sleep_note_stats_responses)
+async def get_sleep_note_stats(period: Literal["week", "month"] = Query("week"),
+                               date_from: date = Query(..., alias="from"),
+                               date_to: date = Query(..., alias="to"),
+                               credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+                               session: AsyncSession = Depends(get_read_session)
+                               ) -> SleepNoteStatsResponse:
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    if date_from > date_to:
+        raise invalid_date_range
+
+    return await get_sleep_note_stats_by_user_id(payload.sub, period, date_from, date_to, session)
+
+
+@sleep_notes_router.get("/search", status_code=HTTP_200_OK,
+                        response_model=SleepNoteSearchResponse, responses=search_sleep_notes_responses)
+async def search_sleep_notes(q: str = Query(..., min_length=1, max_length=100),
+                             limit: int = Query(20, ge=1, le=100),
+                             offset: int = Query(0, ge=0, le=10000),
+                             credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+                             session: AsyncSession = Depends(get_read_session)
+                             ) -> SleepNoteSearchResponse:
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    return await search_sleep_notes_by_user_id(payload.sub, q, limit, offset, session)
+
+
+@sleep_notes_router.get("/export", status_code=HTTP_200_OK,
+                        response_class=StreamingResponse, responses=export_sleep_notes_responses)
+async def export_sleep_notes(request: Request,
+                             export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+                             credentials: HTTPAuthorizationCredentials = Depends(http_bearer)
+                             ) -> StreamingResponse:
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    selected_format = export_formats[export_format]
+    return StreamingResponse(
+        export_sleep_notes_by_user_id(payload.sub, selected_format, reads_own_writes(request)),
+        media_type=selected_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="sleep_notes.{selected_format.extension}"'}
+    )
+
+
 @sleep_notes_router.get("/{note_id}", status_code=HTTP_200_OK,
                         response_model=SleepNoteReadResponse, responses=get_sleep_goal_responses)
 async def get_sleep_note_by_id(note_id: int,
+                               if_none_match: str | None = Header(None),
                                credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
-                               session: AsyncSession = Depends(get_session)
-                               ) -> SleepNoteReadResponse:
+                               session: AsyncSession = Depends(get_read_session)
+                               ) -> Response:
     token = credentials.credentials
     payload = decode_access_token(token)
+    if if_none_match is not None:
+        version = await get_sleep_note_version_by_id_and_user_id(note_id, payload.sub, session)
+        if version is not None and if_none_match_satisfied(if_none_match, version):
+            return not_modified(version)
+
     sleep_note = await get_sleep_note_by_id_and_user_id(note_id, payload.sub, session)
     if sleep_note is None:
         raise sleep_note_not_found
 
-    return SleepNoteReadResponse.model_validate(sleep_note)
+    return sleep_note_read_serializer.response(sleep_note, headers=etag_headers(sleep_note.version))
 
 
 @sleep_notes_router.get("/", status_code=HTTP_200_OK,
                         response_model=SleepNoteReadResponse, responses=get_sleep_goal_responses)
 async def get_sleep_note_by_date(note_date: date = Query(...),
+                                 if_none_match: str | None = Header(None),
                                  credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
-                                 session: AsyncSession = Depends(get_session)
-                                 ) -> SleepNoteReadResponse:
+                                 session: AsyncSession = Depends(get_read_session)
+                                 ) -> Response:
     token = credentials.credentials
     payload = decode_access_token(token)
+    if if_none_match is not None:
+        version = await get_sleep_note_version_by_date_and_user_id(note_date, payload.sub, session)
+        if version is not None and if_none_match_satisfied(if_none_match, version):
+            return not_modified(version)
+
     sleep_note = await get_sleep_note_by_date_and_user_id(note_date, payload.sub, session)
     if sleep_note is None:
         raise sleep_note_not_found
 
-    return SleepNoteReadResponse.model_validate(sleep_note)
+    return sleep_note_read_serializer.response(sleep_note, headers=etag_headers(sleep_note.version))
 
 
 @sleep_notes_router.post("/", status_code=HTTP_201_CREATED,
@@ -123,6 +281,30 @@ async def create_sleep_note(body: SleepNoteCreateRequest,
     return Response(status_code=HTTP_201_CREATED)
 
 
+@sleep_notes_router.put("/", status_code=HTTP_200_OK,
+                        response_class=Response, responses=upsert_sleep_note_responses)
+async def put_sleep_note_by_date(body: SleepNoteUpsertRequest,
+                                 note_date: date = Query(...),
+                                 credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+                                 session: AsyncSession = Depends(get_session)
+                                 ) -> Response:
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    created = await upsert_sleep_note(note_date, payload.sub, body, session)
+    return Response(status_code=HTTP_201_CREATED if created else HTTP_200_OK)
+
+
+@sleep_notes_router.post("/batch", status_code=HTTP_201_CREATED,
+                         response_model=SleepNoteBatchCreateResponse, responses=create_sleep_note_batch_responses)
+async def create_sleep_notes_batch(body: SleepNoteBatchCreateRequest,
+                                   credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+                                   session: AsyncSession = Depends(get_session)
+                                   ) -> SleepNoteBatchCreateResponse:
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    return await create_new_sleep_notes(payload.sub, body, session)
+
+
 @sleep_notes_router.delete("/{note_id}", status_code=HTTP_200_OK,
                            response_class=Response, responses=delete_sleep_note_responses)
 async def delete_sleep_note_by_id(note_id: int,
@@ -157,6 +339,7 @@ async def delete_sleep_note_by_date(note_date: date = Query(...),
                           response_class=Response, responses=update_sleep_note_responses)
 async def update_sleep_note_by_id(note_id: int,
                                   body: SleepNoteUpdateRequest,
+                                  if_match: str | None = Header(None),
                                   credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
                                   session: AsyncSession = Depends(get_session)
                                   ) -> Response:
@@ -166,17 +349,28 @@ async def update_sleep_note_by_id(note_id: int,
     if not updated_sleep_goal_params:
         raise no_parameters
 
-    updated = await update_sleep_note_by_id_and_user_id(note_id, payload.sub, updated_sleep_goal_params, session)
-    if not updated:
+    version = await update_sleep_note_by_id_and_user_id(
+        note_id,
+        payload.sub,
+        updated_sleep_goal_params,
+        session,
+        parse_if_match(if_match)
+    )
+    if version is None:
+        if if_match is not None:
+            current_version = await get_sleep_note_version_by_id_and_user_id(note_id, payload.sub, session)
+            if current_version is not None:
+                raise precondition_failed
         raise sleep_note_not_found
 
-    return Response(status_code=HTTP_200_OK)
+    return Response(status_code=HTTP_200_OK, headers=etag_headers(version))
 
 
 @sleep_notes_router.patch("/", status_code=HTTP_200_OK,
                           response_class=Response, responses=update_sleep_note_responses)
 async def update_sleep_note_by_date(body: SleepNoteUpdateRequest,
                                     note_date: date = Query(...),
+                                    if_match: str | None = Header(None),
                                     credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
                                     session: AsyncSession = Depends(get_session)
                                     ) -> Response:
@@ -186,8 +380,18 @@ async def update_sleep_note_by_date(body: SleepNoteUpdateRequest,
     if not updated_sleep_goal_params:
         raise no_parameters
 
-    updated = await update_sleep_note_by_date_and_user_id(note_date, payload.sub, updated_sleep_goal_params, session)
-    if not updated:
+    version = await update_sleep_note_by_date_and_user_id(
+        note_date,
+        payload.sub,
+        updated_sleep_goal_params,
+        session,
+        parse_if_match(if_match)
+    )
+    if version is None:
+        if if_match is not None:
+            current_version = await get_sleep_note_version_by_date_and_user_id(note_date, payload.sub, session)
+            if current_version is not None:
+                raise precondition_failed
         raise sleep_note_not_found
 
-    return Response(status_code=HTTP_200_OK)
+    return Response(status_code=HTTP_200_OK, headers=etag_headers(version))
@@ -1,24 +1,37 @@
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Header, Response
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
+    HTTP_304_NOT_MODIFIED,
     HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
     HTTP_409_CONFLICT,
     HTTP_503_SERVICE_UNAVAILABLE,
     HTTP_401_UNAUTHORIZED,
-    HTTP_403_FORBIDDEN
+    HTTP_403_FORBIDDEN,
+    HTTP_412_PRECONDITION_FAILED
 )
 
-from src.api.actions.users import get_user_by_id, create_new_user, delete_user_by_id, update_user_by_id
+from src.api.actions.users import (
+    get_user_by_id,
+    get_user_version_by_id,
+    create_new_user,
+    delete_user_by_id,
+    update_user_by_id
+)
 from src.api.schemas.users import UserReadResponse, UserCreateRequest, UserUpdateRequest
+from src.api.utils.etags import etag_headers, if_none_match_satisfied, not_modified, parse_if_match
+from src.api.utils.serializers import user_read_serializer
 from src.api.utils.tokens import decode_access_token
 from src.api.views import (
     http_bearer,
     user_not_found,
     no_parameters,
+    precondition_failed,
+    not_modified_info,
+    precondition_failed_info,
     no_database_connection_info,
     database_conflict_info,
     bad_request_info,
@@ -28,7 +41,7 @@ from src.api.views import (
     unauthorized_info,
     forbidden_info
 )
-from src.core.session import get_session
+from src.core.session import get_session, get_read_session
 
 users_router = APIRouter(prefix='/users', tags=["Users"])
 
@@ -36,6 +49,7 @@ successful_user_read_info = {"model": UserReadResponse, "description": "Successf
 
 get_user_responses = {
     HTTP_200_OK: successful_user_read_info,
+    HTTP_304_NOT_MODIFIED: not_modified_info,
     HTTP_401_UNAUTHORIZED: unauthorized_info,
     HTTP_403_FORBIDDEN: forbidden_info,
     HTTP_404_NOT_FOUND: user_not_found_info,
@@ -63,21 +77,28 @@ update_user_responses = {
     HTTP_403_FORBIDDEN: forbidden_info,
     HTTP_404_NOT_FOUND: user_not_found_info,
     HTTP_409_CONFLICT: database_conflict_info,
+    HTTP_412_PRECONDITION_FAILED: precondition_failed_info,
     HTTP_503_SERVICE_UNAVAILABLE: no_database_connection_info
 }
 
 
 @users_router.get("/", status_code=HTTP_200_OK, response_model=UserReadResponse, responses=get_user_responses)
-async def get_user(credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
-                   session: AsyncSession = Depends(get_session)
-                   ) -> UserReadResponse:
+async def get_user(if_none_match: str | None = Header(None),
+                   credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+                   session: AsyncSession = Depends(get_read_session)
+                   ) -> Response:
     token = credentials.credentials
     payload = decode_access_token(token)
+    if if_none_match is not None:
+        version = await get_user_version_by_id(payload.sub, session)
+        if version is not None and if_none_match_satisfied(if_none_match, version):
+            return not_modified(version)
+
     user = await get_user_by_id(payload.sub, session)
     if user is None:
         raise user_not_found
 
-    return UserReadResponse.model_validate(user)
+    return user_read_serializer.response(user, headers=etag_headers(user.version))
 
 
 @users_router.post("/", status_code=HTTP_201_CREATED, response_class=Response, responses=create_user_responses)
@@ -103,6 +124,7 @@ async def delete_user(credentials: HTTPAuthorizationCredentials = Depends(http_b
 
 @users_router.patch("/", status_code=HTTP_200_OK, response_class=Response, responses=update_user_responses)
 async def update_user(body: UserUpdateRequest,
+                      if_match: str | None = Header(None),
                       credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
                       session: AsyncSession = Depends(get_session)
                       ) -> Response:
@@ -112,8 +134,10 @@ async def update_user(body: UserUpdateRequest,
     if not updated_user_params:
         raise no_parameters
 
-    updated = await update_user_by_id(payload.sub, updated_user_params, session)
-    if not updated:
+    version = await update_user_by_id(payload.sub, updated_user_params, session, parse_if_match(if_match))
+    if version is None:
+        if if_match is not None and await get_user_version_by_id(payload.sub, session) is not None:
+            raise precondition_failed
         raise user_not_found
 
-    return Response(status_code=HTTP_200_OK)
+    return Response(status_code=HTTP_200_OK, headers=etag_headers(version))
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -5,6 +7,21 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class RunConfig(BaseModel):
     host: str
     port: int
+    reload: bool
+    workers: int
+    loop: Literal["auto", "asyncio", "uvloop"]
+    http: Literal["auto", "h11", "httptools"]
+    backlog: int
+    timeout_keep_alive: int
+    timeout_graceful_shutdown: int
+    limit_max_requests: int
+    proxy_headers: bool
+    forwarded_allow_ips: str
+
+
+class ReplicaConfig(BaseModel):
+    host: str
+    port: int
 
 
 class DatabaseConfig(BaseModel):
@@ -13,16 +30,28 @@ class DatabaseConfig(BaseModel):
     user: str
     password: str
     database: str
+    replicas: list[ReplicaConfig]
+    read_your_writes_seconds: float
+
+    def _url(self, host: str, port: int) -> str:
+        return f"postgresql+asyncpg://{self.user}:{self.password}@{host}:{port}/{self.database}"
 
     @property
     def url(self):
-        return f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+        return self._url(self.host, self.port)
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [self._url(replica.host, replica.port) for replica in self.replicas]
 
 
 class EngineConfig(BaseModel):
     echo: bool
     pool_size: int
     max_overflow: int
+    pool_timeout: float
+    max_expected_wait_ms: float
+    statement_cache_size: int
 
 
 class JWTConfig(BaseModel):
@@ -30,6 +59,40 @@ class JWTConfig(BaseModel):
     algorithm: str
     access_token_expiration_minutes: int
     refresh_token_expiration_days: int
+    access_token_cache_size: int
+
+
+class HashingConfig(BaseModel):
+    executor: Literal["thread", "process"]
+    workers: int
+    max_pending: int
+
+
+class CacheConfig(BaseModel):
+    backend: Literal["memory", "none"]
+    max_size: int
+    ttl_seconds: float
+    negative_ttl_seconds: float
+
+
+class QueriesConfig(BaseModel):
+    slow_threshold_ms: float
+    budget: int
+
+
+class RouteRateLimitConfig(BaseModel):
+    rate: float
+    burst: int
+
+
+class RateLimitConfig(BaseModel):
+    backend: Literal["memory", "none"]
+    rate: float
+    burst: int
+    routes: dict[str, RouteRateLimitConfig]
+    ip_routes: list[str]
+    max_buckets: int
+    idle_seconds: float
 
 
 class Settings(BaseSettings):
@@ -43,6 +106,10 @@ class Settings(BaseSettings):
     db: DatabaseConfig
     engine: EngineConfig
     jwt: JWTConfig
+    hashing: HashingConfig
+    cache: CacheConfig
+    queries: QueriesConfig
+    rate_limit: RateLimitConfig
 
 
 settings = Settings()
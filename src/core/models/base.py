@@ -1,5 +1,9 @@
+from sqlalchemy import Sequence
 from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
     pass
+
+
+row_version_seq = Sequence("row_version_seq", metadata=Base.metadata)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.models.base import Base
+
+
+class SleepAdherenceReportsORM(Base):
+    __tablename__ = "sleep_adherence_reports"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True
+    )
+    week_start: Mapped[date] = mapped_column(primary_key=True)
+    nights_logged: Mapped[int]
+    nights_on_target: Mapped[int]
+    adherence: Mapped[float]
+    avg_bedtime_deviation_minutes: Mapped[float | None]
+    avg_wake_deviation_minutes: Mapped[float | None]
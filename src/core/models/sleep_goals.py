@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from datetime import time
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import BigInteger, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 
-from src.core.models.base import Base
+from src.core.models.base import Base, row_version_seq
 
 
 class SleepGoalsORM(Base):
@@ -17,3 +17,4 @@ class SleepGoalsORM(Base):
     )
     sleep_start: Mapped[time]
     sleep_end: Mapped[time]
+    version: Mapped[int] = mapped_column(BigInteger, server_default=row_version_seq.next_value())
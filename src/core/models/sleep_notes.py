@@ -1,16 +1,33 @@
 from __future__ import annotations
 
 from datetime import time, date
+from typing import Any
 
-from sqlalchemy import String, ForeignKey, UniqueConstraint, CheckConstraint
+from sqlalchemy import (
+    BigInteger,
+    String,
+    ForeignKey,
+    UniqueConstraint,
+    CheckConstraint,
+    Computed,
+    DDL,
+    Index,
+    event
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
-from src.core.models.base import Base
+from src.core.models.base import Base, row_version_seq
+
+SEARCH_CONFIG = "english"
 
 
 class SleepNotesORM(Base):
     __tablename__ = "sleep_notes"
-    __table_args__ = (UniqueConstraint("user_id", "note_date"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "note_date"),
+        Index("ix_sleep_notes_user_id_comment_search", "user_id", "comment_search", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     note_date: Mapped[date]
@@ -19,3 +36,12 @@ class SleepNotesORM(Base):
     rating: Mapped[int | None] = mapped_column(CheckConstraint("rating IS NULL OR (rating >= 1 AND rating <= 5)"))
     comment: Mapped[str | None] = mapped_column(String(300))
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"))
+    version: Mapped[int] = mapped_column(BigInteger, server_default=row_version_seq.next_value())
+    comment_search: Mapped[Any] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', coalesce(comment, ''))", persisted=True),
+        deferred=True
+    )
+
+
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gin"))
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 
-from sqlalchemy import String
+from sqlalchemy import BigInteger, String
 from sqlalchemy.orm import Mapped, mapped_column
 
-from src.core.models.base import Base
+from src.core.models.base import Base, row_version_seq
 
 
 class UsersORM(Base):
@@ -15,3 +15,4 @@ class UsersORM(Base):
     display_name: Mapped[str] = mapped_column(String(50))
     password_hash: Mapped[str] = mapped_column(String(120))
     refresh_token_id: Mapped[str | None] = mapped_column(String(32))
+    version: Mapped[int] = mapped_column(BigInteger, server_default=row_version_seq.next_value())
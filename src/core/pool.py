@@ -0,0 +1,117 @@
+import math
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool
+
+from src.core.config import settings
+from src.core.metrics import PhaseTimer, metrics_registry
+
+HOLD_TIME_SMOOTHING = 0.1
+
+pool_wait_duration = metrics_registry.histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection"
+)
+
+
+class PoolSaturatedError(Exception):
+    def __init__(self, expected_wait: float):
+        super().__init__(f"Expected connection pool wait of {expected_wait:.3f}s exceeds the admission budget")
+        self.expected_wait = expected_wait
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.expected_wait))
+
+
+class PoolMonitor:
+    def __init__(self, max_expected_wait_seconds: float):
+        self.max_expected_wait_seconds = max_expected_wait_seconds
+        self._pool: Pool | None = None
+        self._capacity = 0
+
+        self.waiters = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.avg_hold_seconds = 0.0
+
+    def attach(self, engine: AsyncEngine) -> None:
+        pool = engine.sync_engine.pool
+        self._pool = pool
+        self._capacity = settings.engine.pool_size + settings.engine.max_overflow
+
+        @event.listens_for(pool, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info["checked_out_at"] = time.perf_counter()
+
+        @event.listens_for(pool, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            checked_out_at = connection_record.info.pop("checked_out_at", None)
+            if checked_out_at is None:
+                return
+            hold_seconds = time.perf_counter() - checked_out_at
+            if self.avg_hold_seconds:
+                self.avg_hold_seconds += HOLD_TIME_SMOOTHING * (hold_seconds - self.avg_hold_seconds)
+            else:
+                self.avg_hold_seconds = hold_seconds
+
+    def detach(self) -> None:
+        self._pool = None
+
+    @property
+    def checked_out(self) -> int:
+        return self._pool.checkedout() if self._pool is not None else 0
+
+    @property
+    def overflow(self) -> int:
+        return max(self._pool.overflow(), 0) if self._pool is not None else 0
+
+    def expected_wait(self) -> float:
+        if self._pool is None or not self._capacity:
+            return 0.0
+        available = self._capacity - self.checked_out
+        queue_position = self.waiters - available + 1
+        if queue_position <= 0:
+            return 0.0
+        return queue_position * self.avg_hold_seconds / self._capacity
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        expected_wait = self.expected_wait()
+        if expected_wait > self.max_expected_wait_seconds:
+            self.rejected += 1
+            raise PoolSaturatedError(expected_wait)
+
+        self.admitted += 1
+        self.waiters += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.waiters -= 1
+            pool_wait_duration.observe((), time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self._capacity,
+            "checked_out": self.checked_out,
+            "overflow": self.overflow,
+            "waiters": self.waiters,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_hold_seconds": self.avg_hold_seconds,
+            "expected_wait_seconds": self.expected_wait()
+        }
+
+
+pool_monitor = PoolMonitor(settings.engine.max_expected_wait_ms / 1000)
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self) -> ConnectionPoolEntry:
+        with pool_monitor.admit(), PhaseTimer("pool"):
+            return super()._do_get()
@@ -0,0 +1,135 @@
+import functools
+import inspect
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import settings
+from src.core.metrics import record_phase
+
+slow_query_logger = logging.getLogger("sleep_scheduler.slow_queries")
+query_budget_logger = logging.getLogger("sleep_scheduler.query_budget")
+
+current_dal_method: ContextVar[str | None] = ContextVar("current_dal_method", default=None)
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "rows")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+
+request_query_stats: ContextVar[QueryStats | None] = ContextVar("request_query_stats", default=None)
+
+_whitespace = re.compile(r"\s+")
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_number_literal = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+_parameter_list = re.compile(r"\(\s*\$\d+(?:\s*,\s*\$\d+)*\s*\)")
+_repeated_rows = re.compile(r"\(\.\.\.\)(?:, \(\.\.\.\))+")
+
+
+def normalize_sql(statement: str) -> str:
+    statement = _whitespace.sub(" ", statement).strip()
+    statement = _string_literal.sub("?", statement)
+    statement = _number_literal.sub("?", statement)
+    statement = _parameter_list.sub("(...)", statement)
+    return _repeated_rows.sub("(...), ...", statement)
+
+
+def traced_dal(cls: type) -> type:
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        if inspect.iscoroutinefunction(attribute):
+            setattr(cls, name, _traced_method(f"{cls.__name__}.{name}", attribute))
+        elif inspect.isasyncgenfunction(attribute):
+            setattr(cls, name, _traced_generator(f"{cls.__name__}.{name}", attribute))
+    return cls
+
+
+def _traced_method(qualified_name: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = current_dal_method.set(qualified_name)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            current_dal_method.reset(token)
+
+    return wrapper
+
+
+def _traced_generator(qualified_name: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        generator = method(*args, **kwargs)
+        try:
+            while True:
+                token = current_dal_method.set(qualified_name)
+                try:
+                    item = await anext(generator)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    current_dal_method.reset(token)
+                yield item
+        finally:
+            await generator.aclose()
+
+    return wrapper
+
+
+def _rows_returned(cursor) -> int:
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        return cursor.rowcount
+    return len(getattr(cursor, "_rows", ()) or ())
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        rows = _rows_returned(cursor)
+        record_phase("db", elapsed)
+
+        stats = request_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.rows += rows
+
+        if elapsed * 1000 >= settings.queries.slow_threshold_ms:
+            slow_query_logger.warning(json.dumps({
+                "event": "slow_query",
+                "duration_ms": round(elapsed * 1000, 3),
+                "dal_method": current_dal_method.get(),
+                "statement": normalize_sql(statement),
+                "rows": rows,
+                "executemany": executemany
+            }))
+
+
+def check_query_budget(method: str, route: str, stats: QueryStats) -> None:
+    if stats.count > settings.queries.budget:
+        query_budget_logger.warning(json.dumps({
+            "event": "query_budget_exceeded",
+            "method": method,
+            "route": route,
+            "queries": stats.count,
+            "budget": settings.queries.budget,
+            "db_ms": round(stats.seconds * 1000, 3),
+            "rows": stats.rows
+        }))
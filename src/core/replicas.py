@@ -0,0 +1,80 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import settings
+
+READ_YOUR_WRITES_COOKIE = "last_write_at"
+
+
+class WriteMarker:
+    __slots__ = ("wrote_at",)
+
+    def __init__(self):
+        self.wrote_at: float | None = None
+
+
+request_write_marker: ContextVar[WriteMarker | None] = ContextVar("request_write_marker", default=None)
+
+
+def mark_request_write() -> None:
+    marker = request_write_marker.get()
+    if marker is not None:
+        marker.wrote_at = time.time()
+
+
+class ReplicaRouter:
+    def __init__(self, read_your_writes_seconds: float):
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.engines: list[AsyncEngine] = []
+        self.outstanding: list[int] = []
+
+        self.primary_reads = 0
+        self.replica_reads = 0
+        self.sticky_reads = 0
+
+    def add(self, engine: AsyncEngine) -> None:
+        self.engines.append(engine)
+        self.outstanding.append(0)
+
+    def clear(self) -> None:
+        self.engines.clear()
+        self.outstanding.clear()
+
+    def recently_wrote(self, last_write_at: str | None) -> bool:
+        if not last_write_at or self.read_your_writes_seconds <= 0:
+            return False
+        try:
+            elapsed = time.time() - float(last_write_at)
+        except ValueError:
+            return False
+        return 0 <= elapsed < self.read_your_writes_seconds
+
+    def acquire(self, primary: bool) -> int | None:
+        if not self.engines or primary:
+            self.primary_reads += 1
+            if self.engines:
+                self.sticky_reads += 1
+            return None
+
+        index = min(range(len(self.engines)), key=self.outstanding.__getitem__)
+        self.outstanding[index] += 1
+        self.replica_reads += 1
+        return index
+
+    def release(self, index: int) -> None:
+        if index < len(self.outstanding):
+            self.outstanding[index] -= 1
+
+    def stats(self) -> dict:
+        return {
+            "replicas": len(self.engines),
+            "outstanding": sum(self.outstanding),
+            "primary_reads": self.primary_reads,
+            "replica_reads": self.replica_reads,
+            "sticky_reads": self.sticky_reads
+        }
+
+
+replica_router = ReplicaRouter(settings.db.read_your_writes_seconds)
@@ -1,23 +1,180 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import Request
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    create_async_engine,
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession
+)
 
 from src.core.config import settings
+from src.core.pool import MonitoredQueuePool, pool_monitor
+from src.core.query_stats import instrument_engine
+from src.core.replicas import READ_YOUR_WRITES_COOKIE, mark_request_write, replica_router
+
+engine: AsyncEngine | None = None
+
+REPLICA_INDEX_KEY = "replica_index"
+PRIMARY_KEY = "primary"
+WROTE_KEY = "wrote"
+
+
+class ReadOnlySession(Session):
+    def get_bind(self, *args, **kwargs) -> Engine:
+        if REPLICA_INDEX_KEY not in self.info:
+            self.info[REPLICA_INDEX_KEY] = replica_router.acquire(self.info.get(PRIMARY_KEY, False))
+
+        replica_index = self.info[REPLICA_INDEX_KEY]
+        if replica_index is None:
+            return engine.sync_engine
+        return replica_router.engines[replica_index].sync_engine
+
+
+@event.listens_for(Session, "after_flush")
+def mark_flush_as_write(session: Session, flush_context) -> None:
+    session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def mark_dml_as_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE_KEY] = True
 
-engine = create_async_engine(
-    settings.db.url,
-    future=True,
-    echo=settings.engine.echo,
-    pool_size=settings.engine.pool_size,
-    max_overflow=settings.engine.max_overflow
-)
 
 async_session_factory = async_sessionmaker(
-    engine,
     autoflush=False,
     expire_on_commit=False,
     autocommit=False
 )
+read_session_factory = async_sessionmaker(
+    sync_session_class=ReadOnlySession,
+    autoflush=False,
+    expire_on_commit=False,
+    autocommit=False
+)
+
+
+def create_engine(url: str | None = None, poolclass: type[Pool] = AsyncAdaptedQueuePool) -> AsyncEngine:
+    return create_async_engine(
+        url or settings.db.url,
+        future=True,
+        echo=settings.engine.echo,
+        poolclass=poolclass,
+        pool_size=settings.engine.pool_size,
+        max_overflow=settings.engine.max_overflow,
+        pool_timeout=settings.engine.pool_timeout,
+        connect_args={"prepared_statement_cache_size": settings.engine.statement_cache_size}
+    )
+
+
+def init_engine() -> AsyncEngine:
+    global engine
+    if engine is None:
+        engine = create_engine(poolclass=MonitoredQueuePool)
+        instrument_engine(engine)
+        pool_monitor.attach(engine)
+        async_session_factory.configure(bind=engine)
+        for replica_url in settings.db.replica_urls:
+            replica_engine = create_engine(replica_url)
+            instrument_engine(replica_engine)
+            replica_router.add(replica_engine)
+    return engine
+
+
+async def warm_up_engine(prepare: Callable[[AsyncConnection], Awaitable[None]] | None = None) -> None:
+    engines = [init_engine(), *replica_router.engines]
+    connections = await asyncio.gather(
+        *(warm_engine.connect() for warm_engine in engines for _ in range(settings.engine.pool_size))
+    )
+    try:
+        if prepare is not None:
+            await asyncio.gather(*(prepare(connection) for connection in connections))
+    finally:
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+
+async def dispose_engine() -> None:
+    global engine
+    if engine is not None:
+        pool_monitor.detach()
+        await asyncio.gather(engine.dispose(), *(replica.dispose() for replica in replica_router.engines))
+        replica_router.clear()
+        engine = None
+
+UNIT_OF_WORK_KEY = "unit_of_work"
+
+
+class UnitOfWork:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.info = {}
+        self._after_commit_callbacks: list[Callable[[], None]] = []
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self._after_commit_callbacks.append(callback)
+
+    def _run_after_commit(self) -> None:
+        for callback in self._after_commit_callbacks:
+            callback()
+
+
+def current_unit_of_work(session: AsyncSession) -> UnitOfWork | None:
+    return session.info.get(UNIT_OF_WORK_KEY)
+
+
+def reads_from_replica(session: AsyncSession) -> bool:
+    return session.info.get(REPLICA_INDEX_KEY) is not None
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[UnitOfWork]:
+    active_unit_of_work = current_unit_of_work(session)
+    if active_unit_of_work is not None:
+        yield active_unit_of_work
+        return
+
+    new_unit_of_work = UnitOfWork(session)
+    session.info[UNIT_OF_WORK_KEY] = new_unit_of_work
+    try:
+        async with session.begin():
+            yield new_unit_of_work
+    finally:
+        session.info.pop(UNIT_OF_WORK_KEY, None)
+        wrote = session.info.pop(WROTE_KEY, False)
+
+    if wrote:
+        mark_request_write()
+    new_unit_of_work._run_after_commit()
 
 
 async def get_session():
     async with async_session_factory() as session:
         yield session
+
+
+@asynccontextmanager
+async def read_session(primary: bool = False) -> AsyncIterator[AsyncSession]:
+    async with read_session_factory() as session:
+        session.info[PRIMARY_KEY] = primary
+        try:
+            yield session
+        finally:
+            replica_index = session.info.get(REPLICA_INDEX_KEY)
+            if replica_index is not None:
+                replica_router.release(replica_index)
+
+
+def reads_own_writes(request: Request) -> bool:
+    return replica_router.recently_wrote(request.cookies.get(READ_YOUR_WRITES_COOKIE))
+
+
+async def get_read_session(request: Request):
+    async with read_session(reads_own_writes(request)) as session:
+        yield session
@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time as timer
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, time, timedelta
+from pathlib import Path
+
+from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.models.sleep_adherence_reports import SleepAdherenceReportsORM
+from src.core.models.sleep_goals import SleepGoalsORM
+from src.core.models.sleep_notes import SleepNotesORM
+from src.core.session import async_session_factory, init_engine, dispose_engine
+
+logger = logging.getLogger("adherence")
+
+MINUTES_PER_DAY = 24 * 60
+DAYS_PER_WEEK = 7
+
+insert_adherence_report_query = insert(SleepAdherenceReportsORM)
+upsert_adherence_report_query = insert_adherence_report_query.on_conflict_do_update(
+    index_elements=[SleepAdherenceReportsORM.user_id, SleepAdherenceReportsORM.week_start],
+    set_={
+        "nights_logged": insert_adherence_report_query.excluded.nights_logged,
+        "nights_on_target": insert_adherence_report_query.excluded.nights_on_target,
+        "adherence": insert_adherence_report_query.excluded.adherence,
+        "avg_bedtime_deviation_minutes": insert_adherence_report_query.excluded.avg_bedtime_deviation_minutes,
+        "avg_wake_deviation_minutes": insert_adherence_report_query.excluded.avg_wake_deviation_minutes
+    }
+)
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _deviation(actual: time, goal: time) -> int:
+    diff = (_minutes(actual) - _minutes(goal)) % MINUTES_PER_DAY
+    if diff >= MINUTES_PER_DAY // 2:
+        diff -= MINUTES_PER_DAY
+    return abs(diff)
+
+
+def compute_adherence(goals: list[tuple[int, time, time]],
+                      notes: list[tuple[int, time, time]],
+                      week_start: date,
+                      tolerance_minutes: int
+                      ) -> list[dict]:
+    notes_by_user = defaultdict(list)
+    for user_id, sleep_start, sleep_end in notes:
+        notes_by_user[user_id].append((sleep_start, sleep_end))
+
+    reports = []
+    for user_id, goal_start, goal_end in goals:
+        user_notes = notes_by_user.get(user_id, [])
+        bedtime_deviations = [_deviation(sleep_start, goal_start) for sleep_start, _ in user_notes]
+        wake_deviations = [_deviation(sleep_end, goal_end) for _, sleep_end in user_notes]
+        nights_on_target = sum(
+            1 for bedtime, wake in zip(bedtime_deviations, wake_deviations)
+            if bedtime <= tolerance_minutes and wake <= tolerance_minutes
+        )
+        nights_logged = len(user_notes)
+        reports.append({
+            "user_id": user_id,
+            "week_start": week_start,
+            "nights_logged": nights_logged,
+            "nights_on_target": nights_on_target,
+            "adherence": nights_on_target / DAYS_PER_WEEK,
+            "avg_bedtime_deviation_minutes":
+                sum(bedtime_deviations) / nights_logged if nights_logged else None,
+            "avg_wake_deviation_minutes":
+                sum(wake_deviations) / nights_logged if nights_logged else None
+        })
+    return reports
+
+
+def load_checkpoint(path: Path, week_start: date) -> int:
+    if not path.exists():
+        return 0
+    checkpoint = json.loads(path.read_text())
+    if checkpoint.get("week_start") != week_start.isoformat():
+        return 0
+    return checkpoint["last_user_id"]
+
+
+def save_checkpoint(path: Path, week_start: date, last_user_id: int) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps({"week_start": week_start.isoformat(), "last_user_id": last_user_id}))
+    tmp_path.replace(path)
+
+
+async def fetch_notes(user_ids: list[int], week_start: date) -> list[tuple[int, time, time]]:
+    query = (
+        select(SleepNotesORM.user_id, SleepNotesORM.sleep_start, SleepNotesORM.sleep_end)
+        .where(
+            and_(
+                SleepNotesORM.user_id.in_(user_ids),
+                SleepNotesORM.note_date >= week_start,
+                SleepNotesORM.note_date < week_start + timedelta(days=DAYS_PER_WEEK)
+            )
+        )
+    )
+    async with async_session_factory() as session:
+        async with session.begin():
+            result = await session.execute(query)
+            return [tuple(row) for row in result.all()]
+
+
+async def write_reports(reports: list[dict]) -> None:
+    if not reports:
+        return
+
+    async with async_session_factory() as session:
+        async with session.begin():
+            await session.execute(upsert_adherence_report_query, reports)
+
+
+async def run(week_start: date,
+              chunk_size: int,
+              workers: int,
+              tolerance_minutes: int,
+              checkpoint_path: Path
+              ) -> None:
+    init_engine()
+    last_user_id = load_checkpoint(checkpoint_path, week_start)
+    if last_user_id:
+        logger.info("Resuming week %s after user %d", week_start, last_user_id)
+
+    query = (
+        select(SleepGoalsORM.user_id, SleepGoalsORM.sleep_start, SleepGoalsORM.sleep_end)
+        .where(SleepGoalsORM.user_id > last_user_id)
+        .order_by(SleepGoalsORM.user_id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    loop = asyncio.get_running_loop()
+    in_flight = deque()
+    processed = 0
+    started_at = timer.perf_counter()
+
+    async def drain_oldest() -> None:
+        nonlocal processed
+        chunk_last_user_id, future = in_flight.popleft()
+        reports = await future
+        await write_reports(reports)
+        save_checkpoint(checkpoint_path, week_start, chunk_last_user_id)
+        processed += len(reports)
+        elapsed = timer.perf_counter() - started_at
+        logger.info("Processed %d users (%.1f users/sec)", processed, processed / elapsed if elapsed else 0.0)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with async_session_factory() as session:
+            async with session.begin():
+                result = await session.stream(query)
+                async for partition in result.partitions(chunk_size):
+                    goals = [tuple(row) for row in partition]
+                    notes = await fetch_notes([user_id for user_id, _, _ in goals], week_start)
+                    future = loop.run_in_executor(
+                        pool, compute_adherence, goals, notes, week_start, tolerance_minutes
+                    )
+                    in_flight.append((goals[-1][0], future))
+                    if len(in_flight) >= workers * 2:
+                        await drain_oldest()
+
+        while in_flight:
+            await drain_oldest()
+
+    elapsed = timer.perf_counter() - started_at
+    logger.info(
+        "Finished week %s: %d users in %.1fs (%.1f users/sec)",
+        week_start, processed, elapsed, processed / elapsed if elapsed else 0.0
+    )
+    await dispose_engine()
+
+
+def parse_args() -> argparse.Namespace:
+    today = date.today()
+    last_week_start = today - timedelta(days=today.weekday() + DAYS_PER_WEEK)
+
+    parser = argparse.ArgumentParser(description="Compute weekly sleep goal adherence for every user")
+    parser.add_argument("--week-start", type=date.fromisoformat, default=last_week_start)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tolerance-minutes", type=int, default=30)
+    parser.add_argument("--checkpoint", type=Path, default=Path("adherence.checkpoint.json"))
+    parser.add_argument("--reset", action="store_true", help="Ignore an existing checkpoint")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    args = parse_args()
+    if args.reset:
+        args.checkpoint.unlink(missing_ok=True)
+
+    asyncio.run(run(args.week_start, args.chunk_size, args.workers, args.tolerance_minutes, args.checkpoint))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,49 @@
+import os
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.api.dals.warmup import prepare_hot_statements
 from src.api.utils.error_handlers import register_exception_handlers
+from src.api.utils.passwords import password_hasher
+from src.api.utils.rate_limit import rate_limit
+from src.api.utils.read_your_writes import ReadYourWritesMiddleware
+from src.api.utils.timing import TimingMiddleware
 from src.api.views.auth import auth_router
+from src.api.views.health import health_router
+from src.api.views.metrics import metrics_router
 from src.api.views.sleep_goals import sleep_goals_router
 from src.api.views.sleep_notes import sleep_notes_router
 from src.api.views.users import users_router
 from src.core.config import settings
+from src.core.session import init_engine, warm_up_engine, dispose_engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    init_engine()
+    await warm_up_engine(prepare_hot_statements)
+    app.state.ready = True
+
+    yield
+
+    app.state.ready = False
+    await dispose_engine()
+    password_hasher.shutdown()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
-app.include_router(auth_router)
-app.include_router(users_router)
-app.include_router(sleep_goals_router)
-app.include_router(sleep_notes_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(auth_router, dependencies=[Depends(rate_limit)])
+app.include_router(users_router, dependencies=[Depends(rate_limit)])
+app.include_router(sleep_goals_router, dependencies=[Depends(rate_limit)])
+app.include_router(sleep_notes_router, dependencies=[Depends(rate_limit)])
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,8 +52,39 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(TimingMiddleware)
 
 register_exception_handlers(app)
 
+
+def run() -> None:
+    if settings.run.reload:
+        uvicorn.run(
+            "src.main:app",
+            reload=True,
+            host=settings.run.host,
+            port=settings.run.port,
+            proxy_headers=settings.run.proxy_headers,
+            forwarded_allow_ips=settings.run.forwarded_allow_ips
+        )
+        return
+
+    uvicorn.run(
+        "src.main:app",
+        host=settings.run.host,
+        port=settings.run.port,
+        workers=settings.run.workers or os.cpu_count() or 1,
+        loop=settings.run.loop,
+        http=settings.run.http,
+        backlog=settings.run.backlog,
+        timeout_keep_alive=settings.run.timeout_keep_alive,
+        timeout_graceful_shutdown=settings.run.timeout_graceful_shutdown,
+        limit_max_requests=settings.run.limit_max_requests or None,
+        proxy_headers=settings.run.proxy_headers,
+        forwarded_allow_ips=settings.run.forwarded_allow_ips
+    )
+
+
 if __name__ == "__main__":
-    uvicorn.run("main:app", reload=True, host=settings.run.host, port=settings.run.port)
+    run()